@@ -1,4 +1,5 @@
 import os
+import threading
 from flask import Flask
 from flask_cors import CORS
 from flask_jwt_extended import JWTManager
@@ -36,5 +37,27 @@ def create_app(config_class=Config):
     app.register_blueprint(preferences_bp, url_prefix='/api/user')
     app.register_blueprint(feedback_bp, url_prefix='/api')
     
+    # CLI commands (ensure-indexes, check-indexes, ...)
+    from app.commands import register_commands
+    register_commands(app)
+    
+    # Ensure MongoDB indexes in the background so startup never waits on Mongo
+    if app.config.get('MONGO_ENSURE_INDEXES', True):
+        threading.Thread(target=bootstrap_indexes, args=(app,), name='ensure-indexes', daemon=True).start()
+    
     return app
 
+def bootstrap_indexes(app):
+    """Create missing MongoDB indexes, logging any failures"""
+    from app.indexes import ensure_indexes
+    with app.app_context():
+        try:
+            for collection, name, error in ensure_indexes(mongo.db):
+                if error:
+                    app.logger.error(
+                        f"Failed to ensure index {collection}.{name}: {error} "
+                        "(flask check-indexes fails until it exists)"
+                    )
+        except Exception as e:
+            app.logger.error(f"Index bootstrap failed: {str(e)}")
+
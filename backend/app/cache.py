@@ -0,0 +1,203 @@
+"""
+In-process TTL caches with stale-while-revalidate and size-bounded eviction
+"""
+import threading
+import time
+from collections import OrderedDict
+from flask import current_app, has_app_context
+
+# All named caches in this worker, for stats reporting
+_registry = {}
+_registry_lock = threading.Lock()
+
+class TTLCache:
+    """
+    Thread-safe LRU cache whose entries expire after a TTL.
+
+    Entries older than ``ttl`` but younger than ``ttl + stale_ttl`` are still
+    served while a single background refresh runs for that key. Concurrent
+    misses for the same key share one loader call. Loaders returning None
+    are treated as failures and never cached.
+    """
+
+    # Upper bound on how long a coalesced caller waits for the leader's load
+    LOAD_WAIT_SECONDS = 60
+
+    def __init__(self, name, ttl, stale_ttl=0, max_entries=256):
+        self.name = name
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> (value, stored_at)
+        self._refreshing = set()
+        self._loading = {}  # key -> threading.Event for in-flight misses
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'stale_hits': 0, 'misses': 0, 'coalesced': 0, 'evictions': 0, 'refresh_errors': 0}
+        _registry[name] = self
+
+    def get(self, key):
+        """Return a fresh cached value or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and time.monotonic() - entry[1] < self.ttl:
+                self._entries.move_to_end(key)
+                self._stats['hits'] += 1
+                return entry[0]
+            return None
+
+    def age(self, key):
+        """Return seconds since key was stored, or None if it is not cached"""
+        with self._lock:
+            entry = self._entries.get(key)
+            return time.monotonic() - entry[1] if entry else None
+
+    def set(self, key, value, age=0):
+        """
+        Store a value, evicting least recently used entries past max_entries
+
+        age backdates the entry for a value that was produced age seconds
+        ago elsewhere, so it expires when the original would.
+        """
+        if value is None:
+            return
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() - age)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats['evictions'] += 1
+
+    def delete(self, key):
+        """Drop a key from the cache"""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        """Drop all entries"""
+        with self._lock:
+            self._entries.clear()
+
+    def get_or_load(self, key, loader, block=True):
+        """
+        Return the cached value for key, calling loader() on a miss
+
+        Fresh entries are returned directly. Stale entries are returned
+        immediately and refreshed once in the background. Missing or expired
+        entries are loaded synchronously; concurrent callers missing the same
+        key wait for the first caller's load instead of calling loader again.
+        With block=False a miss returns None immediately instead of loading.
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry:
+                age = now - entry[1]
+                if age < self.ttl:
+                    self._entries.move_to_end(key)
+                    self._stats['hits'] += 1
+                    return entry[0]
+                if age < self.ttl + self.stale_ttl:
+                    self._entries.move_to_end(key)
+                    self._stats['stale_hits'] += 1
+                    start_refresh = key not in self._refreshing
+                    if start_refresh:
+                        self._refreshing.add(key)
+                    stale_value = entry[0]
+                else:
+                    stale_value = None
+            else:
+                stale_value = None
+            if stale_value is None and not block:
+                self._stats['misses'] += 1
+                return None
+            if stale_value is None:
+                loading = self._loading.get(key)
+                if loading is None:
+                    loading = self._loading[key] = threading.Event()
+                    is_leader = True
+                    self._stats['misses'] += 1
+                else:
+                    is_leader = False
+                    self._stats['coalesced'] += 1
+
+        if stale_value is not None:
+            if start_refresh:
+                self._start_refresh(key, loader)
+            return stale_value
+
+        if not is_leader:
+            # Another caller is already loading this key; share its result
+            loading.wait(self.LOAD_WAIT_SECONDS)
+            with self._lock:
+                entry = self._entries.get(key)
+            return entry[0] if entry else None
+
+        try:
+            value = loader()
+            self.set(key, value)
+            return value
+        finally:
+            with self._lock:
+                self._loading.pop(key, None)
+            loading.set()
+
+    def _start_refresh(self, key, loader):
+        """Refresh key on a daemon thread, inside the caller's app context"""
+        app = current_app._get_current_object() if has_app_context() else None
+
+        def refresh():
+            try:
+                if app is not None:
+                    with app.app_context():
+                        value = loader()
+                else:
+                    value = loader()
+                if value is None:
+                    with self._lock:
+                        self._stats['refresh_errors'] += 1
+                self.set(key, value)
+            except Exception as e:
+                with self._lock:
+                    self._stats['refresh_errors'] += 1
+                if app is not None:
+                    app.logger.error(f"Background refresh failed for cache '{self.name}': {e}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=refresh, name=f'cache-refresh-{self.name}', daemon=True).start()
+
+    def stats(self):
+        """Return hit/miss counters and current size"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['size'] = len(self._entries)
+        stats['max_entries'] = self.max_entries
+        stats['ttl'] = self.ttl
+        stats['stale_ttl'] = self.stale_ttl
+        return stats
+
+def get_cache(name, config_prefix, default_ttl, default_stale_ttl=0, default_max_entries=256):
+    """
+    Return the named cache, creating it from app config on first use
+
+    Reads ``<config_prefix>_TTL_SECONDS``, ``<config_prefix>_STALE_SECONDS``
+    and ``<config_prefix>_MAX_ENTRIES`` from the current app config.
+    """
+    cache = _registry.get(name)
+    if cache is None:
+        config = current_app.config
+        with _registry_lock:
+            cache = _registry.get(name)
+            if cache is None:
+                cache = TTLCache(
+                    name,
+                    ttl=config.get(f'{config_prefix}_TTL_SECONDS', default_ttl),
+                    stale_ttl=config.get(f'{config_prefix}_STALE_SECONDS', default_stale_ttl),
+                    max_entries=config.get(f'{config_prefix}_MAX_ENTRIES', default_max_entries)
+                )
+    return cache
+
+def all_cache_stats():
+    """Return stats for every cache created in this worker"""
+    return {name: cache.stats() for name, cache in _registry.items()}
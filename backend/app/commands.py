@@ -0,0 +1,115 @@
+"""
+Flask CLI commands for operations tasks (run with `flask --app wsgi <command>`)
+"""
+import os
+import time
+import bson
+import click
+from bson.codec_options import CodecOptions
+from bson.raw_bson import RawBSONDocument
+from app import mongo
+from app.indexes import ensure_indexes, check_indexes_exist, check_query_plans
+from app.tallies import rebuild_tallies
+from app.queries import USER_PROJECTIONS
+from app.services.password_hasher import PasswordHasher, get_bcrypt_rounds
+from app.utils import hash_password, verify_password
+
+def register_commands(app):
+    """Attach CLI commands to the app"""
+
+    @app.cli.command('ensure-indexes')
+    def ensure_indexes_command():
+        """Create the MongoDB indexes the app relies on"""
+        failed = False
+        for collection, name, error in ensure_indexes(mongo.db):
+            if error:
+                failed = True
+                click.echo(f"FAILED {collection}.{name}: {error}")
+            else:
+                click.echo(f"ok     {collection}.{name}")
+        if failed:
+            raise SystemExit(1)
+
+    @app.cli.command('check-indexes')
+    def check_indexes_command():
+        """Fail if an index is missing or any hot query does a COLLSCAN"""
+        failed = False
+        for collection, name, ok in check_indexes_exist(mongo.db):
+            if not ok:
+                failed = True
+            click.echo(f"{'ok    ' if ok else 'MISSING'} index {collection}.{name}")
+        for description, stages, ok in check_query_plans(mongo.db):
+            if not ok:
+                failed = True
+            click.echo(f"{'ok    ' if ok else 'FAILED'} {description}: {' <- '.join(stages)}")
+        if failed:
+            raise SystemExit(1)
+
+    @app.cli.command('rebuild-tallies')
+    def rebuild_tallies_command():
+        """Recompute vote_tallies from the feedback collection"""
+        count = rebuild_tallies(mongo.db)
+        click.echo(f"Rebuilt {count} vote tallies")
+
+    @app.cli.command('bench-passwords')
+    @click.option('--rounds', type=int, default=None, help='bcrypt cost (defaults to BCRYPT_ROUNDS)')
+    @click.option('--seconds', type=float, default=5.0, help='Duration of each measurement')
+    @click.option('--processes', type=int, default=None, help='Pool size (defaults to PASSWORD_HASH_WORKERS)')
+    def bench_passwords_command(rounds, seconds, processes):
+        """Measure password verifications (logins) per second, inline and on the pool"""
+        rounds = rounds or get_bcrypt_rounds()
+        processes = processes or app.config.get('PASSWORD_HASH_WORKERS', 2) or os.cpu_count()
+        password = 'benchmark-password'
+        password_hash = hash_password(password, rounds)
+
+        count = 0
+        started = time.perf_counter()
+        while time.perf_counter() - started < seconds:
+            verify_password(password, password_hash)
+            count += 1
+        inline_rate = count / (time.perf_counter() - started)
+        click.echo(f"cost {rounds}: {inline_rate:.1f} logins/s on one core ({1000 / inline_rate:.0f} ms each)")
+
+        hasher = PasswordHasher(workers=processes, max_pending=processes * 2)
+        try:
+            # Start every worker process before measuring
+            for future in [hasher.submit(verify_password, password, password_hash) for _ in range(processes)]:
+                future.result()
+            pending = []
+            count = 0
+            started = time.perf_counter()
+            while time.perf_counter() - started < seconds:
+                while len(pending) < processes * 2:
+                    pending.append(hasher.submit(verify_password, password, password_hash))
+                pending.pop(0).result()
+                count += 1
+            pool_rate = count / (time.perf_counter() - started)
+        finally:
+            hasher.shutdown()
+        click.echo(f"pool of {processes}: {pool_rate:.1f} logins/s total, {pool_rate / processes:.1f} per core")
+
+    @app.cli.command('bench-user-queries')
+    @click.option('--email', default=None, help='User to load (defaults to any user)')
+    @click.option('--iterations', type=int, default=10000, help='Decodes per projection')
+    def bench_user_queries_command(email, iterations):
+        """Compare bytes and BSON decode time of full vs projected user documents"""
+        users = mongo.db.users.with_options(codec_options=CodecOptions(document_class=RawBSONDocument))
+        query = {'email': email} if email else {}
+        projections = {'full document': None, **USER_PROJECTIONS}
+
+        baseline = None
+        for name, projection in projections.items():
+            raw = users.find_one(query, projection)
+            if raw is None:
+                click.echo('No matching user found')
+                raise SystemExit(1)
+            data = raw.raw
+            started = time.perf_counter()
+            for _ in range(iterations):
+                bson.decode(data)
+            decode_us = (time.perf_counter() - started) / iterations * 1e6
+            baseline = baseline or (len(data), decode_us)
+            click.echo(
+                f"{name:<14} {len(data):>6} bytes ({len(data) / baseline[0]:>4.0%})  "
+                f"{decode_us:>6.2f} us decode ({decode_us / baseline[1]:>4.0%})"
+            )
@@ -11,6 +11,15 @@ class Config:
     
     # MongoDB configuration
     MONGO_URI = os.environ.get('MONGO_URI') or 'mongodb://localhost:27017/crypto_dashboard'
+    MONGO_ENSURE_INDEXES = (os.environ.get('MONGO_ENSURE_INDEXES') or 'true').lower() == 'true'
+    
+    # Password hashing (bcrypt runs in a per-worker process pool; 0 workers = inline)
+    BCRYPT_ROUNDS = int(os.environ.get('BCRYPT_ROUNDS') or 12)
+    PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS') or 2)
+    # Per gunicorn worker: each worker has its own pool and pending-job bound
+    PASSWORD_HASH_MAX_PENDING = int(os.environ.get('PASSWORD_HASH_MAX_PENDING') or 16)
+    PASSWORD_HASH_TIMEOUT_SECONDS = float(os.environ.get('PASSWORD_HASH_TIMEOUT_SECONDS') or 10)
+    PASSWORD_HASH_RETRY_AFTER_SECONDS = int(os.environ.get('PASSWORD_HASH_RETRY_AFTER_SECONDS') or 1)
     
     # External API keys
     COINGECKO_API_KEY = os.environ.get('COINGECKO_API_KEY') or ''
@@ -25,6 +34,105 @@ class Config:
     # AI Model configuration
     AI_MODEL = os.environ.get('AI_MODEL') or 'meta-llama/llama-3.2-3b-instruct:free'
 
+    # AI insight cache, keyed by (investor_type, assets) cohort
+    AI_INSIGHT_CACHE_TTL_SECONDS = float(os.environ.get('AI_INSIGHT_CACHE_TTL_SECONDS') or 86400)
+    AI_INSIGHT_CACHE_STALE_SECONDS = float(os.environ.get('AI_INSIGHT_CACHE_STALE_SECONDS') or 3600)
+    AI_INSIGHT_CACHE_MAX_ENTRIES = int(os.environ.get('AI_INSIGHT_CACHE_MAX_ENTRIES') or 1024)
+
+    # Background pre-generation of insights for popular cohorts
+    AI_PREGEN_ENABLED = (os.environ.get('AI_PREGEN_ENABLED') or 'true').lower() == 'true'
+    AI_PREGEN_INTERVAL_SECONDS = float(os.environ.get('AI_PREGEN_INTERVAL_SECONDS') or 900)
+    AI_PREGEN_MAX_COHORTS = int(os.environ.get('AI_PREGEN_MAX_COHORTS') or 50)
+    AI_PREGEN_MAX_CALLS_PER_RUN = int(os.environ.get('AI_PREGEN_MAX_CALLS_PER_RUN') or 20)
+    AI_PREGEN_MIN_INTERVAL_SECONDS = float(os.environ.get('AI_PREGEN_MIN_INTERVAL_SECONDS') or 2)
+    AI_PREGEN_REFRESH_AHEAD_SECONDS = float(os.environ.get('AI_PREGEN_REFRESH_AHEAD_SECONDS') or 3600)
+
+    # Shared upstream HTTP client (pools are per gunicorn worker)
+    UPSTREAM_POOL_HOSTS = int(os.environ.get('UPSTREAM_POOL_HOSTS') or 10)
+    UPSTREAM_POOL_MAXSIZE = int(os.environ.get('UPSTREAM_POOL_MAXSIZE') or 10)
+    UPSTREAM_MAX_RETRIES = int(os.environ.get('UPSTREAM_MAX_RETRIES') or 2)
+    UPSTREAM_BACKOFF_BASE_SECONDS = float(os.environ.get('UPSTREAM_BACKOFF_BASE_SECONDS') or 0.5)
+    UPSTREAM_BACKOFF_MAX_SECONDS = float(os.environ.get('UPSTREAM_BACKOFF_MAX_SECONDS') or 5)
+
+    # Per-upstream circuit breakers
+    CIRCUIT_FAILURE_RATE = float(os.environ.get('CIRCUIT_FAILURE_RATE') or 0.5)
+    CIRCUIT_WINDOW = int(os.environ.get('CIRCUIT_WINDOW') or 20)
+    CIRCUIT_MIN_CALLS = int(os.environ.get('CIRCUIT_MIN_CALLS') or 5)
+    CIRCUIT_COOLDOWN_SECONDS = float(os.environ.get('CIRCUIT_COOLDOWN_SECONDS') or 30)
+
+    # CryptoPanic news ingestion (empty filter = chronological feed)
+    NEWS_INGEST_ENABLED = (os.environ.get('NEWS_INGEST_ENABLED') or 'true').lower() == 'true'
+    NEWS_INGEST_INTERVAL_SECONDS = float(os.environ.get('NEWS_INGEST_INTERVAL_SECONDS') or 120)
+    NEWS_INGEST_MAX_PAGES = int(os.environ.get('NEWS_INGEST_MAX_PAGES') or 3)
+    NEWS_INGEST_FILTER = os.environ.get('NEWS_INGEST_FILTER') or ''
+    NEWS_INGEST_CURRENCIES = os.environ.get('NEWS_INGEST_CURRENCIES') or 'BTC,ETH,BNB,ADA,SOL,XRP'
+    NEWS_STORE_MAX_ITEMS = int(os.environ.get('NEWS_STORE_MAX_ITEMS') or 500)
+
+    # Prefetched Reddit meme pool
+    MEME_POOL_ENABLED = (os.environ.get('MEME_POOL_ENABLED') or 'true').lower() == 'true'
+    MEME_POOL_REFRESH_SECONDS = float(os.environ.get('MEME_POOL_REFRESH_SECONDS') or 300)
+    MEME_POOL_MAX_SIZE = int(os.environ.get('MEME_POOL_MAX_SIZE') or 500)
+    MEME_POOL_MAX_AGE_SECONDS = float(os.environ.get('MEME_POOL_MAX_AGE_SECONDS') or 21600)
+
+    # Static meme corpus (defaults to data/memes.json)
+    MEME_CORPUS_PATH = os.environ.get('MEME_CORPUS_PATH') or ''
+    MEME_CORPUS_CHECK_SECONDS = float(os.environ.get('MEME_CORPUS_CHECK_SECONDS') or 5)
+
+    # Feedback
+    FEEDBACK_BATCH_MAX_ITEMS = int(os.environ.get('FEEDBACK_BATCH_MAX_ITEMS') or 100)
+    FEEDBACK_PAGE_DEFAULT_LIMIT = int(os.environ.get('FEEDBACK_PAGE_DEFAULT_LIMIT') or 100)
+    FEEDBACK_PAGE_MAX_LIMIT = int(os.environ.get('FEEDBACK_PAGE_MAX_LIMIT') or 1000)
+    FEEDBACK_WRITE_BEHIND = (os.environ.get('FEEDBACK_WRITE_BEHIND') or 'false').lower() == 'true'
+    FEEDBACK_FLUSH_INTERVAL_MS = int(os.environ.get('FEEDBACK_FLUSH_INTERVAL_MS') or 500)
+    FEEDBACK_FLUSH_SIZE = int(os.environ.get('FEEDBACK_FLUSH_SIZE') or 200)
+    FEEDBACK_BUFFER_MAX_SIZE = int(os.environ.get('FEEDBACK_BUFFER_MAX_SIZE') or 5000)
+    FEEDBACK_BUFFER_PUT_TIMEOUT_MS = int(os.environ.get('FEEDBACK_BUFFER_PUT_TIMEOUT_MS') or 50)
+
+    # Per-worker user profile cache (profile_version re-checked after REVALIDATE seconds)
+    USER_PROFILE_CACHE_TTL_SECONDS = float(os.environ.get('USER_PROFILE_CACHE_TTL_SECONDS') or 300)
+    USER_PROFILE_CACHE_MAX_ENTRIES = int(os.environ.get('USER_PROFILE_CACHE_MAX_ENTRIES') or 4096)
+    USER_PROFILE_REVALIDATE_SECONDS = float(os.environ.get('USER_PROFILE_REVALIDATE_SECONDS') or 5)
+
+    # Feedback-driven ranking of dashboard content
+    RANKING_ENABLED = (os.environ.get('RANKING_ENABLED') or 'true').lower() == 'true'
+    RANKING_NEWS_CANDIDATES = int(os.environ.get('RANKING_NEWS_CANDIDATES') or 15)
+    RANKING_MEME_CANDIDATES = int(os.environ.get('RANKING_MEME_CANDIDATES') or 5)
+    RANKING_UPVOTE_BOOST = int(os.environ.get('RANKING_UPVOTE_BOOST') or 1)
+    RANKING_MAX_TALLIES = int(os.environ.get('RANKING_MAX_TALLIES') or 50000)
+    RANKING_USER_VOTES_LIMIT = int(os.environ.get('RANKING_USER_VOTES_LIMIT') or 1000)
+    VOTE_SCORE_CACHE_TTL_SECONDS = float(os.environ.get('VOTE_SCORE_CACHE_TTL_SECONDS') or 60)
+    VOTE_SCORE_CACHE_STALE_SECONDS = float(os.environ.get('VOTE_SCORE_CACHE_STALE_SECONDS') or 600)
+    USER_VOTE_CACHE_TTL_SECONDS = float(os.environ.get('USER_VOTE_CACHE_TTL_SECONDS') or 30)
+    USER_VOTE_CACHE_STALE_SECONDS = float(os.environ.get('USER_VOTE_CACHE_STALE_SECONDS') or 300)
+    USER_VOTE_CACHE_MAX_ENTRIES = int(os.environ.get('USER_VOTE_CACHE_MAX_ENTRIES') or 4096)
+
+    # Per-user dashboard snapshots (built at most once per TTL tick, served with ETag)
+    DASHBOARD_SNAPSHOT_ENABLED = (os.environ.get('DASHBOARD_SNAPSHOT_ENABLED') or 'true').lower() == 'true'
+    DASHBOARD_SNAPSHOT_TTL_SECONDS = float(os.environ.get('DASHBOARD_SNAPSHOT_TTL_SECONDS') or 30)
+    DASHBOARD_SNAPSHOT_CACHE_MAX_ENTRIES = int(os.environ.get('DASHBOARD_SNAPSHOT_CACHE_MAX_ENTRIES') or 4096)
+    # Section endpoints (/api/dashboard/<section>) snapshot tick
+    DASHBOARD_NEWS_TTL_SECONDS = float(os.environ.get('DASHBOARD_NEWS_TTL_SECONDS') or 60)
+    DASHBOARD_PRICES_TTL_SECONDS = float(os.environ.get('DASHBOARD_PRICES_TTL_SECONDS') or 30)
+    DASHBOARD_INSIGHT_TTL_SECONDS = float(os.environ.get('DASHBOARD_INSIGHT_TTL_SECONDS') or 3600)
+    DASHBOARD_MEME_TTL_SECONDS = float(os.environ.get('DASHBOARD_MEME_TTL_SECONDS') or 300)
+
+    # Dashboard section fan-out
+    DASHBOARD_SECTION_WORKERS = int(os.environ.get('DASHBOARD_SECTION_WORKERS') or 8)
+    # Queued + running section loaders before sections fall back immediately
+    DASHBOARD_SECTION_MAX_PENDING = int(os.environ.get('DASHBOARD_SECTION_MAX_PENDING') or 16)
+    DASHBOARD_DEADLINE_SECONDS = float(os.environ.get('DASHBOARD_DEADLINE_SECONDS') or 8)
+
+    # CoinGecko price cache (per worker)
+    PRICE_CACHE_TTL_SECONDS = float(os.environ.get('PRICE_CACHE_TTL_SECONDS') or 30)
+    PRICE_CACHE_STALE_SECONDS = float(os.environ.get('PRICE_CACHE_STALE_SECONDS') or 300)
+    PRICE_CACHE_MAX_ENTRIES = int(os.environ.get('PRICE_CACHE_MAX_ENTRIES') or 256)
+
+    # Global market snapshot (top-N plus every asset users follow)
+    MARKET_SNAPSHOT_ENABLED = (os.environ.get('MARKET_SNAPSHOT_ENABLED') or 'true').lower() == 'true'
+    MARKET_SNAPSHOT_INTERVAL_SECONDS = float(os.environ.get('MARKET_SNAPSHOT_INTERVAL_SECONDS') or 60)
+    MARKET_SNAPSHOT_MAX_AGE_SECONDS = float(os.environ.get('MARKET_SNAPSHOT_MAX_AGE_SECONDS') or 600)
+    MARKET_SNAPSHOT_TOP_N = int(os.environ.get('MARKET_SNAPSHOT_TOP_N') or 100)
+
 class DevelopmentConfig(Config):
     """Development configuration"""
     DEBUG = True
@@ -0,0 +1,105 @@
+"""
+MongoDB index management and query-plan verification
+"""
+from bson import ObjectId
+from pymongo import ASCENDING, DESCENDING
+
+# (collection, keys, options) for every index the app relies on
+INDEXES = [
+    ('users', [('email', ASCENDING)], {'name': 'email_unique', 'unique': True}),
+    ('feedback', [('user_id', ASCENDING), ('content_type', ASCENDING), ('content_hash', ASCENDING)],
+     {'name': 'user_content_unique', 'unique': True}),
+    ('feedback', [('user_id', ASCENDING), ('timestamp', DESCENDING), ('_id', DESCENDING)],
+     {'name': 'user_timestamp_id'}),
+    ('vote_tallies', [('content_type', ASCENDING), ('content_hash', ASCENDING)],
+     {'name': 'content_unique', 'unique': True}),
+    ('vote_tallies', [('content_type', ASCENDING), ('score', DESCENDING)], {'name': 'content_type_score'}),
+]
+
+def ensure_indexes(db):
+    """
+    Create all indexes (no-op for ones that already exist)
+
+    Returns:
+        List of (collection, index name, error message or None) tuples
+    """
+    results = []
+    for collection, keys, options in INDEXES:
+        try:
+            db[collection].create_index(keys, **options)
+            results.append((collection, options['name'], None))
+        except Exception as e:
+            results.append((collection, options['name'], str(e)))
+    return results
+
+def index_exists(db, collection, name, unique=False):
+    """True if the named index exists on collection (and is unique, if required)"""
+    existing = db[collection].index_information().get(name)
+    return existing is not None and existing.get('unique', False) == unique
+
+def check_indexes_exist(db):
+    """
+    Report whether every index in INDEXES exists
+
+    A unique index that failed to build (e.g. over duplicate feedback rows)
+    only shows up here; ensure_indexes at startup merely logs the failure.
+
+    Returns:
+        List of (collection, index name, ok) tuples
+    """
+    return [
+        (collection, options['name'], index_exists(db, collection, options['name'], options.get('unique', False)))
+        for collection, keys, options in INDEXES
+    ]
+
+def get_hot_queries(db):
+    """
+    Return the app's hot queries as (description, cursor) pairs for explain()
+
+    Placeholder values are used; the plan only depends on the query shape.
+    """
+    user_id = ObjectId()
+    return [
+        ('users by email', db.users.find({'email': 'explain@example.com'})),
+        ('feedback vote lookup', db.feedback.find({
+            'user_id': user_id,
+            'content_type': 'news',
+            'content_hash': 'explain'
+        })),
+        ('feedback listing by user', db.feedback.find({'user_id': user_id}).sort([('timestamp', -1), ('_id', -1)])),
+        ('feedback listing after cursor', db.feedback.find({
+            'user_id': user_id,
+            '$or': [
+                {'timestamp': {'$lt': user_id.generation_time}},
+                {'timestamp': user_id.generation_time, '_id': {'$lt': user_id}}
+            ]
+        }).sort([('timestamp', -1), ('_id', -1)])),
+        ('top content by score', db.vote_tallies.find({'content_type': 'news'}).sort('score', -1).limit(10)),
+    ]
+
+def find_plan_stages(plan):
+    """Return every stage name in an explain() plan tree"""
+    stages = []
+    if isinstance(plan, dict):
+        if 'stage' in plan:
+            stages.append(plan['stage'])
+        for key in ('inputStage', 'queryPlan', 'winningPlan'):
+            if key in plan:
+                stages.extend(find_plan_stages(plan[key]))
+        for child in plan.get('inputStages', []):
+            stages.extend(find_plan_stages(child))
+    return stages
+
+def check_query_plans(db):
+    """
+    Explain each hot query and report whether it avoids a collection scan
+
+    Returns:
+        List of (description, stages, ok) tuples
+    """
+    results = []
+    for description, cursor in get_hot_queries(db):
+        explain = cursor.explain()
+        stages = find_plan_stages(explain.get('queryPlanner', {}).get('winningPlan', {}))
+        results.append((description, stages, 'COLLSCAN' not in stages))
+    return results
@@ -14,17 +14,21 @@ class User:
             'password_hash': password_hash,
             'name': name,
             'preferences': None,  # Will be set during onboarding
+            'profile_version': 0,  # Bumped on profile changes (cache invalidation)
             'created_at': datetime.utcnow(),
             'updated_at': datetime.utcnow()
         }
     
     @staticmethod
     def update_preferences(user_id, preferences):
-        """Update user preferences"""
+        """Update user preferences, bumping the version stamp used by profile caches"""
         return {
             '$set': {
                 'preferences': preferences,
                 'updated_at': datetime.utcnow()
+            },
+            '$inc': {
+                'profile_version': 1
             }
         }
 
@@ -53,3 +57,26 @@ class Feedback:
             'timestamp': datetime.utcnow()
         }
 
+    @staticmethod
+    def vote_filter(user_id, content_type, content_hash):
+        """Filter matching a user's vote on a piece of content (unique key)"""
+        return {
+            'user_id': ObjectId(user_id) if isinstance(user_id, str) else user_id,
+            'content_type': content_type,
+            'content_hash': content_hash
+        }
+    
+    @staticmethod
+    def vote_update(vote, timestamp=None):
+        """
+        Upsert update that records a vote; key fields come from the filter on insert
+
+        timestamp is when the vote was cast (now if omitted), which differs
+        from the write time for queued votes.
+        """
+        return {
+            '$set': {
+                'vote': vote,
+                'timestamp': timestamp or datetime.utcnow()
+            }
+        }
@@ -0,0 +1,63 @@
+"""
+User queries with named field projections.
+
+Routes ask for a use case ('auth', 'profile', 'dashboard', ...) instead of
+loading whole user documents, so the bcrypt hash and unused fields only
+cross the wire when a route actually needs them.
+"""
+from bson import ObjectId
+from app import mongo
+from app.models import User
+
+# Fields the dashboard needs: preferences, plus updated_at for insight hashes
+DASHBOARD_FIELDS = {'preferences': 1, 'updated_at': 1, 'profile_version': 1}
+
+USER_PROJECTIONS = {
+    # Login: verify the password and build the user summary
+    'auth': {'email': 1, 'name': 1, 'password_hash': 1, 'preferences': 1},
+    # Registration: does a user with this email exist?
+    'exists': {'_id': 1},
+    'dashboard': DASHBOARD_FIELDS,
+    # Cached profile: serves /auth/me, preferences and the dashboard
+    'profile': {**DASHBOARD_FIELDS, 'email': 1, 'name': 1},
+    # Cross-worker cache validation
+    'version': {'_id': 0, 'profile_version': 1},
+}
+
+def to_object_id(user_id):
+    return ObjectId(user_id) if isinstance(user_id, str) else user_id
+
+def find_user(user_id, projection):
+    """
+    Load a user by id with a named projection
+
+    Args:
+        user_id: User id (str or ObjectId)
+        projection: Key of USER_PROJECTIONS
+
+    Returns:
+        Projected user document, or None if the user does not exist
+    """
+    return mongo.db.users.find_one({'_id': to_object_id(user_id)}, USER_PROJECTIONS[projection])
+
+def find_user_by_email(email, projection):
+    """Load a user by (normalized) email with a named projection"""
+    return mongo.db.users.find_one({'email': email}, USER_PROJECTIONS[projection])
+
+def insert_user(email, password_hash, name):
+    """Create a user and return its id"""
+    return mongo.db.users.insert_one(User.create_user(email, password_hash, name)).inserted_id
+
+def update_user_preferences(user_id, preferences):
+    """Store new preferences; returns the UpdateResult"""
+    return mongo.db.users.update_one(
+        {'_id': to_object_id(user_id)},
+        User.update_preferences(user_id, preferences)
+    )
+
+def replace_password_hash(user_id, old_hash, new_hash):
+    """Swap the password hash only if it is still old_hash; returns the UpdateResult"""
+    return mongo.db.users.update_one(
+        {'_id': to_object_id(user_id), 'password_hash': old_hash},
+        {'$set': {'password_hash': new_hash}}
+    )
@@ -3,13 +3,20 @@ Authentication routes: Register, Login, Get Current User
 """
 from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
-from bson import ObjectId
-from app import mongo
-from app.models import User
-from app.utils import hash_password, verify_password
+from app.queries import find_user_by_email, insert_user
+from app.services.user_cache import get_user_profile
+from app.services.password_hasher import (
+    PasswordHasherBusy, get_password_hasher, get_bcrypt_rounds, needs_rehash, rehash_in_background
+)
 
 auth_bp = Blueprint('auth', __name__)
 
+def hasher_busy_response():
+    """503 returned when the password hashing pool is saturated or failing"""
+    response = jsonify({'error': 'The server is busy. Please try again in a moment.'})
+    response.headers['Retry-After'] = str(current_app.config.get('PASSWORD_HASH_RETRY_AFTER_SECONDS', 1))
+    return response, 503
+
 @auth_bp.route('/register', methods=['POST'])
 def register():
     """Register a new user"""
@@ -26,7 +33,7 @@ def register():
         
         # Check if user already exists
         try:
-            existing_user = mongo.db.users.find_one({'email': email})
+            existing_user = find_user_by_email(email, 'exists')
         except Exception as db_error:
             current_app.logger.error(f"Database error during registration check: {str(db_error)}")
             return jsonify({'error': 'Database connection error. Please try again.'}), 500
@@ -35,18 +42,21 @@ def register():
             return jsonify({'error': 'User with this email already exists'}), 400
         
         # Hash password and create user
+        # Set up outside the try below so a pool error isn't reported as a hashing failure
+        hasher = get_password_hasher()
         try:
-            password_hash = hash_password(password)
+            password_hash = hasher.hash(password, get_bcrypt_rounds())
+        except PasswordHasherBusy as busy_error:
+            current_app.logger.warning(f"Registration rejected: {str(busy_error)}")
+            return hasher_busy_response()
         except Exception as hash_error:
+            # The hashing pool failed (not the input): ask the client to retry
             current_app.logger.error(f"Password hashing error: {str(hash_error)}")
-            return jsonify({'error': 'Registration failed. Please try again.'}), 500
-        
-        user_doc = User.create_user(email, password_hash, name)
+            return hasher_busy_response()
         
         # Insert user into database
         try:
-            result = mongo.db.users.insert_one(user_doc)
-            user_id = str(result.inserted_id)
+            user_id = str(insert_user(email, password_hash, name))
         except Exception as insert_error:
             current_app.logger.error(f"Database insert error: {str(insert_error)}")
             return jsonify({'error': 'Failed to create user. Please try again.'}), 500
@@ -90,7 +100,7 @@ def login():
         
         # Find user
         try:
-            user = mongo.db.users.find_one({'email': email})
+            user = find_user_by_email(email, 'auth')
         except Exception as db_error:
             current_app.logger.error(f"Database error during login: {str(db_error)}")
             return jsonify({'error': 'Database connection error. Please try again.'}), 500
@@ -100,16 +110,30 @@ def login():
             return jsonify({'error': 'The username or password is incorrect.'}), 401
         
         # Verify password
+        # Set up outside the try below so a pool error isn't reported as a wrong password
+        hasher = get_password_hasher()
         try:
-            password_valid = verify_password(password, user['password_hash'])
-        except Exception as pwd_error:
+            password_valid = hasher.verify(password, user['password_hash'])
+        except PasswordHasherBusy as busy_error:
+            current_app.logger.warning(f"Login rejected: {str(busy_error)}")
+            return hasher_busy_response()
+        except ValueError as pwd_error:
+            # bcrypt rejects a malformed stored hash; no password can match it
             current_app.logger.error(f"Password verification error: {str(pwd_error)}")
             return jsonify({'error': 'The username or password is incorrect.'}), 401
+        except Exception as pool_error:
+            # A pool failure must not look like a wrong password
+            current_app.logger.error(f"Password verification error: {str(pool_error)}")
+            return hasher_busy_response()
         
         if not password_valid:
             current_app.logger.warning(f"Invalid password attempt for email: {email}")
             return jsonify({'error': 'The username or password is incorrect.'}), 401
         
+        # Upgrade hashes made with a different bcrypt cost
+        if needs_rehash(user['password_hash']):
+            rehash_in_background(user['_id'], password, user['password_hash'])
+        
         # Generate JWT token
         user_id = str(user['_id'])
         access_token = create_access_token(identity=user_id)
@@ -137,7 +161,7 @@ def get_current_user():
     """Get current authenticated user info"""
     try:
         user_id = get_jwt_identity()
-        user = mongo.db.users.find_one({'_id': ObjectId(user_id)})
+        user = get_user_profile(user_id)
         
         if not user:
             return jsonify({'error': 'User not found'}), 404
@@ -1,132 +1,259 @@
 """
 Dashboard route that orchestrates all external API calls
 """
-from flask import Blueprint, jsonify, current_app
+import json
+from flask import Blueprint, Response, jsonify, request, current_app, stream_with_context
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from bson import ObjectId
-from app import mongo
-from app.services.coingecko import get_coin_prices
-from app.services.cryptopanic import get_crypto_news
-from app.services.ai_service import generate_ai_insight
-from app.services.meme_service import get_random_meme
-from app.utils import generate_content_hash
+from app.services.coingecko import get_coin_prices, get_fallback_coins
+from app.services.cryptopanic import get_crypto_news, get_fallback_news
+from app.services.ai_service import get_cached_ai_insight, get_default_insight, stream_ai_insight
+from app.services.meme_service import get_random_memes, get_fallback_meme
+from app.services.ranking import get_ranker
+from app.services.section_executor import run_sections
+from app.services.user_cache import get_user_profile
+from app.services.dashboard_snapshot import get_snapshot, store_snapshot, make_etag
+from app.utils import news_content_hash, price_content_hash, insight_content_hash, meme_content_hash
 
 dashboard_bp = Blueprint('dashboard', __name__)
 
+def tag_news(news_items):
+    """Attach content hashes to news items (stored items already carry one)"""
+    for item in news_items:
+        if 'content_hash' not in item:
+            item['content_hash'] = news_content_hash(item)
+    return news_items
+
+def tag_prices(prices):
+    """Attach content hashes to coin prices"""
+    for coin in prices:
+        if 'content_hash' not in coin:
+            coin['content_hash'] = price_content_hash(coin)
+    return prices
+
+def tag_insight(insight, user):
+    """Attach a content hash to an AI insight"""
+    insight['content_hash'] = insight_content_hash(insight, user)
+    return insight
+
+def tag_meme(meme):
+    """Attach a content hash to a meme"""
+    if 'content_hash' not in meme:
+        meme['content_hash'] = meme_content_hash(meme)
+    return meme
+
+def load_insight(preferences, user, ranker):
+    """Return the cached insight, or a placeholder pointing at the stream endpoint"""
+    insight = get_cached_ai_insight(preferences)
+    if insight is None:
+        # Never block the dashboard on LLM generation
+        return {
+            'pending': True,
+            'stream_url': '/api/dashboard/insight/stream'
+        }
+    insight = tag_insight(insight, user)
+    if ranker.is_hidden(insight):
+        # The user downvoted this insight; show the default one instead
+        return ranker.rank([tag_insight(get_default_insight(preferences), user), insight])[0]
+    return insight
+
+def load_news(interested_assets, ranker):
+    """Fetch news candidates and keep the best-ranked five"""
+    candidates = current_app.config.get('RANKING_NEWS_CANDIDATES', 15)
+    news_items = tag_news(get_crypto_news(limit=candidates, interested_assets=interested_assets))
+    return ranker.rank(news_items, limit=5)
+
+def load_meme(ranker):
+    """Sample random meme candidates and return the best-ranked one"""
+    candidates = current_app.config.get('RANKING_MEME_CANDIDATES', 5)
+    memes = [tag_meme(meme) for meme in get_random_memes(candidates)]
+    return ranker.rank(memes)[0]
+
+def load_prices(interested_assets):
+    """Fetch coin prices, falling back to static coins on an empty result"""
+    prices = get_coin_prices(interested_assets=interested_assets, limit=10)
+    current_app.logger.info(f"Coin prices fetched: {len(prices) if prices else 0} coins")
+
+    # Ensure we always have prices (fallback should provide at least some)
+    if not prices:
+        current_app.logger.warning("Coin prices returned empty list, using fallback")
+        prices = get_fallback_coins()
+
+    return tag_prices(prices)
+
+# Section endpoint name -> key in the dashboard payload
+SECTION_KEYS = {
+    'news': 'news',
+    'prices': 'prices',
+    'insight': 'ai_insight',
+    'meme': 'meme'
+}
+
+# Preference content type -> section
+CONTENT_TYPE_SECTIONS = {
+    'Market News': 'news',
+    'Charts': 'prices',
+    'Social': 'insight',
+    'Fun': 'meme'
+}
+
+def get_section_loaders(user_id, user, sections):
+    """
+    Build run_sections() (loader, fallback) pairs for the given sections
+
+    Returns:
+        Dict keyed by payload key (see SECTION_KEYS)
+    """
+    preferences = user.get('preferences', {})
+    interested_assets = preferences.get('interested_assets', []) if preferences else []
+
+    # Sections that rank candidates load vote scores and the user's votes
+    # inside their loader, so a slow lookup is bounded by the section deadline
+    # (concurrent loads of the same cached data share one query)
+    loaders = {
+        'news': (
+            lambda: load_news(interested_assets, get_ranker(user_id)),
+            lambda: tag_news(get_fallback_news())
+        ),
+        'prices': (
+            lambda: load_prices(interested_assets),
+            lambda: tag_prices(get_fallback_coins())
+        ),
+        'insight': (
+            lambda: load_insight(preferences, user, get_ranker(user_id)),
+            lambda: tag_insight(get_default_insight(preferences), user)
+        ),
+        'meme': (
+            lambda: load_meme(get_ranker(user_id)),
+            lambda: tag_meme(get_fallback_meme())
+        )
+    }
+    return {SECTION_KEYS[section]: loaders[section] for section in sections}
+
+def build_dashboard(user_id, user):
+    """Load every section the user selected and return the dashboard payload"""
+    preferences = user.get('preferences', {})
+    interested_assets = preferences.get('interested_assets', []) if preferences else []
+    content_types = preferences.get('content_types', ['Market News']) if preferences else ['Market News']
+
+    # Only load sections for selected content types
+    sections = [CONTENT_TYPE_SECTIONS[content_type] for content_type in CONTENT_TYPE_SECTIONS
+                if content_type in content_types]
+
+    # Run all selected sections in parallel, bounded by the dashboard deadline
+    results = run_sections(get_section_loaders(user_id, user, sections))
+    dashboard_data = {
+        'news': results.get('news', []),
+        'prices': results.get('prices', []),
+        'ai_insight': results.get('ai_insight', {}),
+        'meme': results.get('meme', {})
+    }
+
+    return {
+        'dashboard': dashboard_data,
+        'user_preferences': {
+            'investor_type': preferences.get('investor_type') if preferences else None,
+            'interested_assets': interested_assets,
+            'content_types': content_types
+        }
+    }
+
+def serialize(payload):
+    """Serialize a payload exactly like jsonify() would"""
+    return f"{current_app.json.dumps(payload)}\n".encode('utf-8')
+
+def snapshot_response(body, etag):
+    """JSON response with a strong ETag; answers If-None-Match with 304"""
+    response = current_app.response_class(body, mimetype='application/json')
+    response.set_etag(etag)
+    # Browsers may keep the body but must revalidate before reusing it, so
+    # votes and manual refreshes show up immediately (as a cheap 304 otherwise)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response.make_conditional(request)
+
 @dashboard_bp.route('/dashboard', methods=['GET'])
 @jwt_required()
 def get_dashboard():
     """Get dashboard data with all sections"""
     try:
         user_id = get_jwt_identity()
-        
+
         # Get user preferences
-        user = mongo.db.users.find_one({'_id': ObjectId(user_id)})
+        user = get_user_profile(user_id)
         if not user:
             return jsonify({'error': 'User not found'}), 404
-        
-        preferences = user.get('preferences', {})
-        interested_assets = preferences.get('interested_assets', []) if preferences else []
-        content_types = preferences.get('content_types', ['Market News']) if preferences else ['Market News']
-        
-        # Fetch data only for selected content types
-        dashboard_data = {
-            'news': [],
-            'prices': [],
-            'ai_insight': {},
-            'meme': {}
-        }
-        
-        # 1. Market News - Only if "Market News" is selected
-        if 'Market News' in content_types:
-            try:
-                news_items = get_crypto_news(limit=5)
-                for item in news_items:
-                    item['content_hash'] = generate_content_hash({
-                        'type': 'news',
-                        'id': item.get('id'),
-                        'title': item.get('title')
-                    })
-                dashboard_data['news'] = news_items
-            except Exception as e:
-                current_app.logger.error(f"Error fetching news: {e}")
-                dashboard_data['news'] = []
-        
-        # 2. Coin Prices (Charts) - Only if "Charts" is selected
-        if 'Charts' in content_types:
-            try:
-                prices = get_coin_prices(interested_assets=interested_assets, limit=10)
-                current_app.logger.info(f"Coin prices fetched: {len(prices) if prices else 0} coins")
-                
-                # Ensure we always have prices (fallback should provide at least some)
-                if not prices or len(prices) == 0:
-                    current_app.logger.warning("Coin prices returned empty list, using fallback")
-                    from app.services.coingecko import get_fallback_coins
-                    prices = get_fallback_coins()
-                
-                # Add content hash to each coin
-                for coin in prices:
-                    coin['content_hash'] = generate_content_hash({
-                        'type': 'price',
-                        'id': coin.get('id'),
-                        'name': coin.get('name')
-                    })
-                
-                dashboard_data['prices'] = prices
-                current_app.logger.info(f"Final prices count: {len(dashboard_data['prices'])}")
-            except Exception as e:
-                current_app.logger.error(f"Error fetching prices: {e}", exc_info=True)
-                # Use fallback coins even on exception
-                try:
-                    from app.services.coingecko import get_fallback_coins
-                    fallback_prices = get_fallback_coins()
-                    for coin in fallback_prices:
-                        coin['content_hash'] = generate_content_hash({
-                            'type': 'price',
-                            'id': coin.get('id'),
-                            'name': coin.get('name')
-                        })
-                    dashboard_data['prices'] = fallback_prices
-                except:
-                    dashboard_data['prices'] = []
-        
-        # 3. AI Insight (Social) - Only if "Social" is selected
-        if 'Social' in content_types:
-            try:
-                insight = generate_ai_insight(preferences)
-                insight['content_hash'] = generate_content_hash({
-                    'type': 'insight',
-                    'text': insight.get('text', ''),
-                    'date': str(user.get('updated_at', ''))
-                })
-                dashboard_data['ai_insight'] = insight
-            except Exception as e:
-                current_app.logger.error(f"Error generating AI insight: {e}")
-                dashboard_data['ai_insight'] = {}
-        
-        # 4. Fun Meme - Only if "Fun" is selected
-        if 'Fun' in content_types:
-            try:
-                meme = get_random_meme()
-                meme['content_hash'] = generate_content_hash({
-                    'type': 'meme',
-                    'id': meme.get('id'),
-                    'url': meme.get('url')
-                })
-                dashboard_data['meme'] = meme
-            except Exception as e:
-                current_app.logger.error(f"Error fetching meme: {e}")
-                dashboard_data['meme'] = {}
-        
-        return jsonify({
-            'dashboard': dashboard_data,
-            'user_preferences': {
-                'investor_type': preferences.get('investor_type') if preferences else None,
-                'interested_assets': interested_assets,
-                'content_types': content_types
-            }
-        }), 200
-        
+
+        # Serve this tick's snapshot if there is one
+        snapshot = get_snapshot(user_id, user)
+        if snapshot is not None:
+            return snapshot_response(*snapshot)
+
+        payload = build_dashboard(user_id, user)
+        body = serialize(payload)
+        if payload['dashboard']['ai_insight'].get('pending'):
+            # Don't pin the placeholder; the next poll should pick up the generated insight
+            return snapshot_response(body, make_etag(body))
+        return snapshot_response(body, store_snapshot(user_id, user, body))
+
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@dashboard_bp.route('/dashboard/<any(news, prices, insight, meme):section>', methods=['GET'])
+@jwt_required()
+def get_dashboard_section(section):
+    """
+    Get a single dashboard section, e.g. /dashboard/news
+
+    Each section is snapshotted per user on its own tick
+    (DASHBOARD_<SECTION>_TTL_SECONDS) and revalidated with its ETag.
+    """
+    try:
+        user_id = get_jwt_identity()
+        user = get_user_profile(user_id)
+        if not user:
+            return jsonify({'error': 'User not found'}), 404
+
+        snapshot = get_snapshot(user_id, user, section)
+        if snapshot is not None:
+            return snapshot_response(*snapshot)
+
+        key = SECTION_KEYS[section]
+        value = run_sections(get_section_loaders(user_id, user, [section]))[key]
+        body = serialize({key: value})
+        if section == 'insight' and value.get('pending'):
+            return snapshot_response(body, make_etag(body))
+        etag = store_snapshot(user_id, user, body, section)
+        return snapshot_response(body, etag)
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@dashboard_bp.route('/dashboard/insight/stream', methods=['GET'])
+@jwt_required()
+def stream_insight():
+    """Stream the user's AI insight as server-sent events"""
+    try:
+        user_id = get_jwt_identity()
+        user = get_user_profile(user_id)
+        if not user:
+            return jsonify({'error': 'User not found'}), 404
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+    preferences = user.get('preferences', {})
+
+    def generate():
+        for event, data in stream_ai_insight(preferences):
+            if event == 'done':
+                data = tag_insight(data, user)
+            else:
+                data = {'text': data}
+            yield f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'
+        }
+    )
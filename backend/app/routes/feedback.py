@@ -1,14 +1,71 @@
 """
 Feedback routes for thumbs up/down voting
 """
-from flask import Blueprint, request, jsonify
+import base64
+import json
+from datetime import datetime
+from flask import Blueprint, Response, request, jsonify, current_app, stream_with_context
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from bson import ObjectId
 from app import mongo
-from app.models import Feedback
+from app.services.feedback_buffer import get_feedback_buffer
+from app.services.ranking import forget_user_votes
+from app.services.dashboard_snapshot import invalidate_snapshot
+from app.tallies import apply_vote_changes
+from app.votes import record_vote, write_votes
 
 feedback_bp = Blueprint('feedback', __name__)
 
+VALID_CONTENT_TYPES = ['news', 'insight', 'meme', 'price']
+
+def validate_vote(data):
+    """
+    Validate a single vote payload
+    
+    Returns:
+        Error message, or None if the vote is valid
+    """
+    if not isinstance(data, dict):
+        return 'Each vote must be an object'
+    
+    content_type = data.get('content_type')
+    content_hash = data.get('content_hash')
+    vote = data.get('vote')
+    
+    if not content_type or not content_hash or vote is None:
+        return 'Missing required fields: content_type, content_hash, vote'
+    
+    if not isinstance(content_hash, str):
+        return 'content_hash must be a string'
+    
+    # Validate content_type
+    if content_type not in VALID_CONTENT_TYPES:
+        return f'Invalid content_type. Must be one of: {", ".join(VALID_CONTENT_TYPES)}'
+    
+    # Validate vote
+    if vote not in [1, -1]:
+        return 'Vote must be 1 (thumbs up) or -1 (thumbs down)'
+    
+    return None
+
+def upsert_vote(user_id, content_type, content_hash, vote):
+    """
+    Record a vote in a single atomic upsert on the unique (user, content) key
+    
+    Returns:
+        Tuple of (created, previous vote or None)
+    """
+    created, previous_vote = record_vote(mongo.db, user_id, content_type, content_hash, vote)
+    update_tallies([(content_type, content_hash, previous_vote, vote)])
+    return created, previous_vote
+
+def update_tallies(changes):
+    """Apply vote changes to the materialized tallies; never fails the vote itself"""
+    try:
+        apply_vote_changes(mongo.db, changes)
+    except Exception as e:
+        current_app.logger.error(f"Failed to update vote tallies: {str(e)}")
+
 @feedback_bp.route('/feedback', methods=['POST'])
 @jwt_required()
 def submit_feedback():
@@ -21,91 +78,221 @@ def submit_feedback():
         if not data:
             return jsonify({'error': 'No data provided'}), 400
         
-        content_type = data.get('content_type')
-        content_hash = data.get('content_hash')
-        vote = data.get('vote')
-        
-        if not content_type or not content_hash or vote is None:
-            return jsonify({'error': 'Missing required fields: content_type, content_hash, vote'}), 400
-        
-        # Validate content_type
-        valid_content_types = ['news', 'insight', 'meme', 'price']
-        if content_type not in valid_content_types:
-            return jsonify({'error': f'Invalid content_type. Must be one of: {", ".join(valid_content_types)}'}), 400
-        
-        # Validate vote
-        if vote not in [1, -1]:
-            return jsonify({'error': 'Vote must be 1 (thumbs up) or -1 (thumbs down)'}), 400
-        
-        # Check if user already voted on this content
-        existing_feedback = mongo.db.feedback.find_one({
-            'user_id': ObjectId(user_id),
-            'content_type': content_type,
-            'content_hash': content_hash
-        })
-        
-        if existing_feedback:
-            # Update existing feedback
-            mongo.db.feedback.update_one(
-                {
-                    'user_id': ObjectId(user_id),
-                    'content_type': content_type,
-                    'content_hash': content_hash
-                },
-                {
-                    '$set': {
-                        'vote': vote,
-                        'timestamp': Feedback.create_feedback(user_id, content_type, content_hash, vote)['timestamp']
-                    }
-                }
-            )
+        error = validate_vote(data)
+        if error:
+            return jsonify({'error': error}), 400
+        
+        content_type = data['content_type']
+        content_hash = data['content_hash']
+        vote = data['vote']
+        
+        # Write-behind mode: queue the vote unless the buffer is saturated
+        # (the buffer drops the user's cached votes and snapshots once flushed)
+        buffer = get_feedback_buffer()
+        if buffer is not None and buffer.add(user_id, content_type, content_hash, vote, datetime.utcnow()):
             return jsonify({
-                'message': 'Feedback updated successfully',
+                'message': 'Feedback queued successfully',
                 'feedback': {
                     'content_type': content_type,
                     'content_hash': content_hash,
                     'vote': vote
                 }
-            }), 200
+            }), 202
         
-        # Create new feedback
-        feedback_doc = Feedback.create_feedback(user_id, content_type, content_hash, vote)
-        mongo.db.feedback.insert_one(feedback_doc)
+        created = upsert_vote(user_id, content_type, content_hash, vote)[0]
+        # Only now, so a concurrent dashboard cannot rebuild from the old votes
+        forget_user_votes(user_id)
+        invalidate_snapshot(user_id)
         
         return jsonify({
-            'message': 'Feedback submitted successfully',
+            'message': 'Feedback submitted successfully' if created else 'Feedback updated successfully',
             'feedback': {
                 'content_type': content_type,
                 'content_hash': content_hash,
                 'vote': vote
             }
-        }), 201
+        }), 201 if created else 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@feedback_bp.route('/feedback/batch', methods=['POST'])
+@jwt_required()
+def submit_feedback_batch():
+    """Submit several votes at once with a single unordered bulk write"""
+    try:
+        user_id = get_jwt_identity()
+        data = request.get_json()
+        
+        votes = data.get('votes') if isinstance(data, dict) else None
+        if not isinstance(votes, list) or not votes:
+            return jsonify({'error': 'votes must be a non-empty array'}), 400
+        
+        max_items = current_app.config.get('FEEDBACK_BATCH_MAX_ITEMS', 100)
+        if len(votes) > max_items:
+            return jsonify({'error': f'A batch may contain at most {max_items} votes'}), 400
+        
+        results = []
+        # Unique key -> index of the last vote for it; earlier duplicates are superseded
+        latest = {}
+        for index, item in enumerate(votes):
+            error = validate_vote(item)
+            if error:
+                results.append({'index': index, 'status': 'error', 'error': error})
+                continue
+            results.append({
+                'index': index,
+                'content_type': item['content_type'],
+                'content_hash': item['content_hash'],
+                'vote': item['vote']
+            })
+            latest[(item['content_type'], item['content_hash'])] = index
+        
+        # Write-behind mode: queue every valid vote unless the buffer is saturated
+        buffer = get_feedback_buffer()
+        if buffer is not None:
+            voted_at = datetime.utcnow()
+            queued = {key for key, index in latest.items()
+                      if buffer.add(user_id, key[0], key[1], votes[index]['vote'], voted_at)}
+            latest = {key: index for key, index in latest.items() if key not in queued}
+            for result in results:
+                if result.get('status') != 'error' and (result['content_type'], result['content_hash']) in queued:
+                    result['status'] = 'queued'
+        
+        # One upsert per distinct content item, in a single unordered round trip
+        op_indexes = list(latest.values())
+        outcomes = write_votes(mongo.db, [
+            (user_id, votes[index]['content_type'], votes[index]['content_hash'], votes[index]['vote'], None)
+            for index in op_indexes
+        ])
+        update_tallies([
+            (votes[index]['content_type'], votes[index]['content_hash'], previous, votes[index]['vote'])
+            for index, (status, previous, _) in zip(op_indexes, outcomes)
+            if status != 'error'
+        ])
+        if any(status != 'error' for status, _, _ in outcomes):
+            # After the write, so a concurrent dashboard cannot rebuild from the old votes
+            forget_user_votes(user_id)
+            invalidate_snapshot(user_id)
+        
+        status_by_key = {}
+        for index, (status, _, error) in zip(op_indexes, outcomes):
+            status_by_key[(votes[index]['content_type'], votes[index]['content_hash'])] = (status, error)
+        
+        for result in results:
+            if result.get('status') in ('error', 'queued'):
+                continue
+            key = (result['content_type'], result['content_hash'])
+            status, error = status_by_key[key]
+            if latest[key] != result['index'] and status != 'error':
+                status = 'superseded'
+            result['status'] = status
+            if error:
+                result['error'] = error
+        
+        return jsonify({
+            'results': results,
+            'created': sum(1 for r in results if r['status'] == 'created'),
+            'updated': sum(1 for r in results if r['status'] == 'updated'),
+            'queued': sum(1 for r in results if r['status'] == 'queued'),
+            'failed': sum(1 for r in results if r['status'] == 'error')
+        }), 200
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+def encode_cursor(doc):
+    """Encode a (timestamp, _id) keyset position as an opaque cursor"""
+    raw = json.dumps({'t': doc['timestamp'].isoformat(), 'id': str(doc['_id'])})
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+def decode_cursor(cursor):
+    """
+    Decode an opaque cursor
+    
+    Returns:
+        Tuple of (timestamp, ObjectId)
+    
+    Raises:
+        ValueError if the cursor is malformed
+    """
+    try:
+        raw = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        return datetime.fromisoformat(raw['t']), ObjectId(raw['id'])
+    except Exception:
+        raise ValueError('Invalid cursor')
+
+def serialize_feedback(doc):
+    """Convert a feedback document to its JSON form"""
+    return {
+        'content_type': doc.get('content_type'),
+        'content_hash': doc.get('content_hash'),
+        'vote': doc.get('vote'),
+        'timestamp': doc['timestamp'].isoformat() if doc.get('timestamp') else None
+    }
+
 @feedback_bp.route('/feedback', methods=['GET'])
 @jwt_required()
 def get_user_feedback():
-    """Get all feedback submitted by the current user"""
+    """
+    Get feedback submitted by the current user, newest first
+    
+    Query params:
+        limit: Page size (default FEEDBACK_PAGE_DEFAULT_LIMIT, max FEEDBACK_PAGE_MAX_LIMIT)
+        cursor: Opaque next_cursor from a previous page
+        format: 'ndjson' to stream one document per line as the cursor yields them
+    """
     try:
         user_id = get_jwt_identity()
         
-        feedback_list = list(mongo.db.feedback.find(
-            {'user_id': ObjectId(user_id)},
-            {'_id': 0, 'user_id': 0}
-        ).sort('timestamp', -1))
+        default_limit = current_app.config.get('FEEDBACK_PAGE_DEFAULT_LIMIT', 100)
+        max_limit = current_app.config.get('FEEDBACK_PAGE_MAX_LIMIT', 1000)
+        try:
+            limit = int(request.args.get('limit', default_limit))
+        except ValueError:
+            return jsonify({'error': 'limit must be an integer'}), 400
+        if limit < 1 or limit > max_limit:
+            return jsonify({'error': f'limit must be between 1 and {max_limit}'}), 400
         
-        # Convert ObjectId to string for JSON serialization
-        for fb in feedback_list:
-            if 'timestamp' in fb:
-                fb['timestamp'] = fb['timestamp'].isoformat()
+        query = {'user_id': ObjectId(user_id)}
+        cursor = request.args.get('cursor')
+        if cursor:
+            try:
+                after_timestamp, after_id = decode_cursor(cursor)
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+            # Keyset pagination: strictly after the last (timestamp, _id) seen
+            query['$or'] = [
+                {'timestamp': {'$lt': after_timestamp}},
+                {'timestamp': after_timestamp, '_id': {'$lt': after_id}}
+            ]
+        
+        find_cursor = mongo.db.feedback.find(
+            query,
+            {'content_type': 1, 'content_hash': 1, 'vote': 1, 'timestamp': 1}
+        ).sort([('timestamp', -1), ('_id', -1)])
+        
+        if request.args.get('format') == 'ndjson':
+            find_cursor = find_cursor.limit(limit).batch_size(min(limit, 500))
+            
+            def generate():
+                for doc in find_cursor:
+                    line = serialize_feedback(doc)
+                    line['cursor'] = encode_cursor(doc)
+                    yield json.dumps(line) + '\n'
+            
+            return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+        
+        # Fetch one extra document to know whether another page exists
+        docs = list(find_cursor.limit(limit + 1))
+        has_more = len(docs) > limit
+        docs = docs[:limit]
         
         return jsonify({
-            'feedback': feedback_list,
-            'count': len(feedback_list)
+            'feedback': [serialize_feedback(doc) for doc in docs],
+            'count': len(docs),
+            'next_cursor': encode_cursor(docs[-1]) if has_more else None
         }), 200
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
-
@@ -2,6 +2,8 @@
 Health check endpoint for monitoring and testing
 """
 from flask import Blueprint, jsonify
+from app.cache import all_cache_stats
+from app.services.circuit_breaker import all_breaker_status
 
 health_bp = Blueprint('health', __name__)
 
@@ -14,6 +16,20 @@ def health_check():
         'message': 'API is running'
     }), 200
 
+@health_bp.route('/health/caches', methods=['GET'])
+def cache_stats():
+    """Hit/miss counters for this worker's in-process caches"""
+    return jsonify({
+        'caches': all_cache_stats()
+    }), 200
+
+@health_bp.route('/health/upstreams', methods=['GET'])
+def upstream_status():
+    """Circuit breaker state for each upstream API in this worker"""
+    return jsonify({
+        'upstreams': all_breaker_status()
+    }), 200
+
 @health_bp.route('/', methods=['GET'])
 def root():
     """Root endpoint"""
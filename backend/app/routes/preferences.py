@@ -3,9 +3,9 @@ User preferences routes for onboarding
 """
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from bson import ObjectId
-from app import mongo
-from app.models import User, Preferences
+from app.models import Preferences
+from app.queries import update_user_preferences
+from app.services.user_cache import get_user_profile, invalidate_user_profile
 
 preferences_bp = Blueprint('preferences', __name__)
 
@@ -52,11 +52,8 @@ def save_preferences():
         )
         
         # Update user document
-        update_data = User.update_preferences(user_id, preferences)
-        result = mongo.db.users.update_one(
-            {'_id': ObjectId(user_id)},
-            update_data
-        )
+        result = update_user_preferences(user_id, preferences)
+        invalidate_user_profile(user_id)
         
         if result.modified_count == 0:
             return jsonify({'error': 'User not found or preferences not updated'}), 404
@@ -75,7 +72,7 @@ def get_preferences():
     """Get current user preferences"""
     try:
         user_id = get_jwt_identity()
-        user = mongo.db.users.find_one({'_id': ObjectId(user_id)})
+        user = get_user_profile(user_id)
         
         if not user:
             return jsonify({'error': 'User not found'}), 404
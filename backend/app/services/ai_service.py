@@ -1,62 +1,111 @@
 """
 OpenRouter AI service for generating daily crypto insights
 """
-import requests
+import json
+import threading
 from flask import current_app
+from app.cache import get_cache
+from app.services import http_client
 
-def generate_ai_insight(user_preferences=None):
+def get_insight_cache():
+    """Return the per-worker AI insight cache"""
+    return get_cache('ai_insights', 'AI_INSIGHT_CACHE', default_ttl=86400, default_stale_ttl=3600)
+
+def get_cohort_key(user_preferences=None):
     """
-    Generate a daily crypto insight using OpenRouter AI
+    Normalize preferences to the cohort that shares one generated insight
     
-    Args:
-        user_preferences: User's preferences dict with investor_type, interested_assets, etc.
+    Returns:
+        Tuple of (investor_type, sorted lowercased assets)
+    """
+    investor_type = user_preferences.get('investor_type', 'General Investor') if user_preferences else 'General Investor'
+    assets = user_preferences.get('interested_assets', []) if user_preferences else []
+    normalized_assets = sorted({asset.lower().strip() for asset in assets if isinstance(asset, str) and asset.strip()})
+    return (investor_type or 'General Investor', tuple(normalized_assets))
+
+def get_cached_ai_insight(user_preferences=None):
+    """
+    Return the cohort's insight without ever calling OpenRouter on the request path
+    
+    A stale insight is returned and refreshed in the background.
     
     Returns:
-        Dictionary with insight text and metadata
+        Dictionary with insight text and metadata, or None if nothing is cached yet
     """
-    try:
-        base_url = current_app.config['OPENROUTER_BASE_URL']
-        api_key = current_app.config.get('OPENROUTER_API_KEY', '')
-        model = current_app.config.get('AI_MODEL', 'meta-llama/llama-3.2-3b-instruct:free')
-        
-        if not api_key:
-            # Return a default insight if no API key
-            return get_default_insight(user_preferences)
-        
-        # Build prompt based on user preferences
-        investor_type = user_preferences.get('investor_type', 'General Investor') if user_preferences else 'General Investor'
-        assets = user_preferences.get('interested_assets', []) if user_preferences else []
-        assets_str = ', '.join(assets) if assets else 'various cryptocurrencies'
-        
-        prompt = f"""You are a crypto market analyst. Provide a brief, insightful daily market analysis (2-3 sentences) for a {investor_type} interested in {assets_str}. 
+    if not current_app.config.get('OPENROUTER_API_KEY', ''):
+        return get_default_insight(user_preferences)
+    
+    from app.services.insight_scheduler import ensure_insight_scheduler
+    ensure_insight_scheduler()
+    
+    insight = get_insight_cache().get_or_load(
+        get_cohort_key(user_preferences),
+        lambda: request_ai_insight(user_preferences),
+        block=False
+    )
+    return dict(insight) if insight is not None else None
+
+def build_insight_request(user_preferences=None):
+    """
+    Build the OpenRouter chat completion request for a user's preferences
+    
+    Returns:
+        Tuple of (url, headers, payload)
+    """
+    base_url = current_app.config['OPENROUTER_BASE_URL']
+    api_key = current_app.config.get('OPENROUTER_API_KEY', '')
+    model = current_app.config.get('AI_MODEL', 'meta-llama/llama-3.2-3b-instruct:free')
+    
+    # Build prompt based on user preferences
+    investor_type = user_preferences.get('investor_type', 'General Investor') if user_preferences else 'General Investor'
+    assets = user_preferences.get('interested_assets', []) if user_preferences else []
+    assets_str = ', '.join(assets) if assets else 'various cryptocurrencies'
+    
+    prompt = f"""You are a crypto market analyst. Provide a brief, insightful daily market analysis (2-3 sentences) for a {investor_type} interested in {assets_str}. 
         
 Keep it concise, informative, and relevant to today's market conditions. Focus on actionable insights or interesting trends."""
 
-        headers = {
-            'Authorization': f'Bearer {api_key}',
-            'Content-Type': 'application/json',
-            'HTTP-Referer': 'https://crypto-dashboard.app',
-            'X-Title': 'Crypto Dashboard'
-        }
+    headers = {
+        'Authorization': f'Bearer {api_key}',
+        'Content-Type': 'application/json',
+        'HTTP-Referer': 'https://crypto-dashboard.app',
+        'X-Title': 'Crypto Dashboard'
+    }
+    
+    payload = {
+        'model': model,
+        'messages': [
+            {
+                'role': 'system',
+                'content': 'You are a helpful crypto market analyst providing daily insights.'
+            },
+            {
+                'role': 'user',
+                'content': prompt
+            }
+        ],
+        'max_tokens': 150,
+        'temperature': 0.7
+    }
+    
+    return f"{base_url}/chat/completions", headers, payload
+
+def request_ai_insight(user_preferences=None):
+    """
+    Request a fresh insight from OpenRouter without caching
+    
+    Returns:
+        Dictionary with insight text and metadata, or None if the call failed
+    """
+    try:
+        if not current_app.config.get('OPENROUTER_API_KEY', ''):
+            return None
         
-        payload = {
-            'model': model,
-            'messages': [
-                {
-                    'role': 'system',
-                    'content': 'You are a helpful crypto market analyst providing daily insights.'
-                },
-                {
-                    'role': 'user',
-                    'content': prompt
-                }
-            ],
-            'max_tokens': 150,
-            'temperature': 0.7
-        }
+        url, headers, payload = build_insight_request(user_preferences)
         
-        response = requests.post(
-            f"{base_url}/chat/completions",
+        response = http_client.post(
+            url,
+            upstream='openrouter',
             headers=headers,
             json=payload,
             timeout=30
@@ -68,16 +117,186 @@ Keep it concise, informative, and relevant to today's market conditions. Focus o
             
             return {
                 'text': insight_text,
-                'model': model,
+                'model': payload['model'],
                 'generated': True
             }
         else:
             current_app.logger.error(f"OpenRouter API error: {response.status_code} - {response.text}")
-            return get_default_insight(user_preferences)
+            return None
             
     except Exception as e:
         current_app.logger.error(f"AI service error: {str(e)}")
-        return get_default_insight(user_preferences)
+        return None
+
+class InsightStream:
+    """
+    One in-flight OpenRouter stream, shared by every request for a cohort
+
+    Followers replay the tokens received so far and then wait for more.
+    insight is the finished insight, or None if the stream failed.
+    """
+
+    def __init__(self):
+        self.chunks = []
+        self.insight = None
+        self.finished = False
+        self._cond = threading.Condition()
+
+    def append(self, text):
+        with self._cond:
+            self.chunks.append(text)
+            self._cond.notify_all()
+
+    def finish(self, insight=None):
+        """Mark the stream finished (only the first call counts)"""
+        with self._cond:
+            if not self.finished:
+                self.insight = insight
+                self.finished = True
+            self._cond.notify_all()
+
+    def follow(self, timeout):
+        """Yield every token from the start, returning once finished or after timeout idle seconds"""
+        position = 0
+        while True:
+            with self._cond:
+                if position >= len(self.chunks) and not self.finished:
+                    self._cond.wait(timeout)
+                chunks = self.chunks[position:]
+                done = self.finished or not chunks
+            position += len(chunks)
+            yield from chunks
+            if done:
+                return
+
+# Cohort key -> InsightStream currently being generated in this worker
+_streams = {}
+_streams_lock = threading.Lock()
+
+# Longest a follower waits for the next token before giving up on the stream
+STREAM_WAIT_SECONDS = 60
+
+def get_insight_stream(user_preferences=None):
+    """
+    Return the cohort's in-flight insight stream, starting one if needed
+
+    Only the first caller for a cohort starts an OpenRouter call; it runs on
+    a background thread so it completes (and fills the cache) even if that
+    caller disconnects.
+    """
+    key = get_cohort_key(user_preferences)
+    with _streams_lock:
+        stream = _streams.get(key)
+        if stream is not None:
+            return stream
+        stream = InsightStream()
+        # A stream may have finished between the caller's cache check and now
+        cached = get_insight_cache().get(key)
+        if cached is not None:
+            stream.append(cached['text'])
+            stream.finish(cached)
+            return stream
+        _streams[key] = stream
+
+    app = current_app._get_current_object()
+
+    def run():
+        with app.app_context():
+            try:
+                run_insight_stream(user_preferences, stream)
+            except Exception as e:
+                app.logger.error(f"AI streaming error: {str(e)}")
+            finally:
+                with _streams_lock:
+                    _streams.pop(key, None)
+                stream.finish(None)
+
+    threading.Thread(target=run, name='insight-stream', daemon=True).start()
+    return stream
+
+def run_insight_stream(user_preferences, stream):
+    """
+    Stream an insight from OpenRouter into stream, caching it once complete
+    """
+    chunks = []
+    complete = False
+    url, headers, payload = build_insight_request(user_preferences)
+    payload = dict(payload, stream=True)
+    try:
+        response = http_client.post(
+            url,
+            upstream='openrouter',
+            headers=headers,
+            json=payload,
+            timeout=30,
+            stream=True
+        )
+        
+        with response:
+            if response.status_code != 200:
+                current_app.logger.error(f"OpenRouter API error: {response.status_code} - {response.text}")
+            else:
+                for line in response.iter_lines(decode_unicode=True):
+                    # Skip keep-alive comments and blank separators
+                    if not line or not line.startswith('data:'):
+                        continue
+                    data = line[len('data:'):].strip()
+                    if data == '[DONE]':
+                        break
+                    delta = json.loads(data)['choices'][0].get('delta', {}).get('content')
+                    if delta:
+                        chunks.append(delta)
+                        stream.append(delta)
+                complete = True
+    except Exception as e:
+        current_app.logger.error(f"AI streaming error: {str(e)}")
+    
+    text = ''.join(chunks).strip()
+    if not text:
+        stream.finish(None)
+        return
+    
+    insight = {
+        'text': text,
+        'model': payload['model'],
+        'generated': True
+    }
+    # Only share insights that finished streaming, never a truncated one
+    if complete:
+        get_insight_cache().set(get_cohort_key(user_preferences), insight)
+    stream.finish(insight)
+
+def stream_ai_insight(user_preferences=None):
+    """
+    Stream an insight from OpenRouter token by token
+    
+    Cached insights are yielded in one piece. Otherwise OpenRouter's
+    streaming mode is used, once per cohort: concurrent requests for the
+    same cohort follow the same stream, and the completed insight is
+    stored in the cohort cache.
+    
+    Yields:
+        ('token', text) tuples as text arrives, then one ('done', insight) tuple
+    """
+    insight = get_cached_ai_insight(user_preferences)
+    if insight is not None:
+        yield ('token', insight['text'])
+        yield ('done', insight)
+        return
+    
+    stream = get_insight_stream(user_preferences)
+    received = False
+    for chunk in stream.follow(STREAM_WAIT_SECONDS):
+        received = True
+        yield ('token', chunk)
+    
+    if stream.insight is None:
+        default = get_default_insight(user_preferences)
+        if not received:
+            yield ('token', default['text'])
+        yield ('done', default)
+        return
+    yield ('done', dict(stream.insight))
 
 def get_default_insight(user_preferences=None):
     """Return a default insight if AI service is unavailable"""
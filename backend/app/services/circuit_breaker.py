@@ -0,0 +1,121 @@
+"""
+Per-upstream circuit breakers.
+
+A breaker opens when the failure rate over the last few calls crosses a
+threshold. While open, calls fail immediately so callers can return their
+fallback content. After a cooldown one probe call is let through
+(half-open); its outcome closes or re-opens the breaker.
+"""
+import threading
+import time
+from collections import deque
+import requests
+from flask import current_app
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+class CircuitOpenError(requests.exceptions.RequestException):
+    """Raised instead of calling an upstream whose breaker is open"""
+
+class CircuitBreaker:
+    """Failure-rate circuit breaker for a single upstream"""
+
+    def __init__(self, name, failure_rate=0.5, window=20, min_calls=5, cooldown=30):
+        self.name = name
+        self.failure_rate = failure_rate
+        self.min_calls = min_calls
+        self.cooldown = cooldown
+        self.state = CLOSED
+        self.opened_at = None
+        self._outcomes = deque(maxlen=window)  # True for success
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+        self._rejected = 0
+
+    def allow_request(self):
+        """Return True if a call may go through, moving open -> half-open after the cooldown"""
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and time.monotonic() - self.opened_at >= self.cooldown:
+                self.state = HALF_OPEN
+                self._probe_in_flight = False
+            if self.state == HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            self._rejected += 1
+            return False
+
+    def record_success(self):
+        """Record a successful call"""
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self._close()
+            self._outcomes.append(True)
+
+    def record_failure(self):
+        """Record a failed call, opening the breaker if the failure rate is too high"""
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self._open()
+                return
+            self._outcomes.append(False)
+            calls = len(self._outcomes)
+            failures = calls - sum(self._outcomes)
+            if calls >= self.min_calls and failures / calls >= self.failure_rate:
+                self._open()
+
+    def _open(self):
+        self.state = OPEN
+        self.opened_at = time.monotonic()
+        self._probe_in_flight = False
+
+    def _close(self):
+        self.state = CLOSED
+        self.opened_at = None
+        self._probe_in_flight = False
+        self._outcomes.clear()
+
+    def status(self):
+        """Return a JSON-serializable view of the breaker"""
+        with self._lock:
+            calls = len(self._outcomes)
+            failures = calls - sum(self._outcomes)
+            retry_in = None
+            if self.state == OPEN:
+                retry_in = max(0.0, round(self.cooldown - (time.monotonic() - self.opened_at), 2))
+            return {
+                'state': self.state,
+                'recent_calls': calls,
+                'recent_failures': failures,
+                'failure_rate': round(failures / calls, 3) if calls else 0.0,
+                'rejected': self._rejected,
+                'retry_in_seconds': retry_in
+            }
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+def get_breaker(name):
+    """Return the breaker for an upstream, creating it from app config on first use"""
+    breaker = _breakers.get(name)
+    if breaker is None:
+        config = current_app.config
+        with _breakers_lock:
+            breaker = _breakers.get(name)
+            if breaker is None:
+                breaker = CircuitBreaker(
+                    name,
+                    failure_rate=config.get('CIRCUIT_FAILURE_RATE', 0.5),
+                    window=config.get('CIRCUIT_WINDOW', 20),
+                    min_calls=config.get('CIRCUIT_MIN_CALLS', 5),
+                    cooldown=config.get('CIRCUIT_COOLDOWN_SECONDS', 30)
+                )
+                _breakers[name] = breaker
+    return breaker
+
+def all_breaker_status():
+    """Return status for every breaker created in this worker"""
+    return {name: breaker.status() for name, breaker in _breakers.items()}
@@ -2,12 +2,59 @@
 CoinGecko API service for fetching cryptocurrency prices
 """
 import requests
+from app.services import http_client
 from flask import current_app
+from app.cache import get_cache
+from app.services.market_snapshot import ensure_snapshot_refresher, get_snapshot_prices, format_market_coin, with_content_hash
+
+# Map common names to CoinGecko IDs
+COIN_ID_MAP = {
+    'bitcoin': 'bitcoin',
+    'btc': 'bitcoin',
+    'ethereum': 'ethereum',
+    'eth': 'ethereum',
+    'binancecoin': 'binancecoin',
+    'binance coin': 'binancecoin',
+    'bnb': 'binancecoin',
+    'cardano': 'cardano',
+    'ada': 'cardano',
+    'solana': 'solana',
+    'sol': 'solana',
+    'ripple': 'ripple',
+    'xrp': 'ripple',
+    'polkadot': 'polkadot',
+    'dot': 'polkadot',
+    'dogecoin': 'dogecoin',
+    'doge': 'dogecoin',
+    'chainlink': 'chainlink',
+    'link': 'chainlink',
+    'litecoin': 'litecoin',
+    'ltc': 'litecoin'
+}
+
+def to_coin_ids(interested_assets):
+    """Convert user asset names/symbols to CoinGecko IDs, preserving order"""
+    coin_ids = []
+    for asset in interested_assets or []:
+        asset_lower = asset.lower().strip()
+        if asset_lower in COIN_ID_MAP:
+            coin_ids.append(COIN_ID_MAP[asset_lower])
+        elif asset_lower not in coin_ids:
+            coin_ids.append(asset_lower)
+    return coin_ids
+
+def get_price_cache():
+    """Return the per-worker CoinGecko price cache"""
+    return get_cache('coin_prices', 'PRICE_CACHE', default_ttl=30, default_stale_ttl=300)
 
 def get_coin_prices(interested_assets=None, limit=10):
     """
     Fetch cryptocurrency prices from CoinGecko
     
+    Prices are served from the shared market snapshot when it covers the
+    request. Otherwise results are cached per (coin id set, limit) and stale
+    entries are served while a single background refresh runs.
+    
     Args:
         interested_assets: List of coin IDs user is interested in (e.g., ['bitcoin', 'ethereum'])
         limit: Maximum number of coins to return
@@ -15,68 +62,66 @@ def get_coin_prices(interested_assets=None, limit=10):
     Returns:
         List of coin data with prices
     """
+    coin_ids = to_coin_ids(interested_assets)[:limit]
+    
+    ensure_snapshot_refresher()
+    coins = get_snapshot_prices(coin_ids, limit)
+    if coins is not None:
+        return coins
+    
+    cache_key = (tuple(sorted(set(coin_ids))), limit)
+    
+    try:
+        coins = get_price_cache().get_or_load(cache_key, lambda: fetch_coin_prices(coin_ids, limit))
+    except Exception as e:
+        current_app.logger.error(f"CoinGecko API error: {str(e)}", exc_info=True)
+        coins = None
+    
+    if coins is None:
+        return get_fallback_coins()
+    
+    # Callers annotate coins in place, so hand out copies of cached entries
+    return [dict(coin) for coin in coins]
+
+def fetch_coin_prices(coin_ids, limit=10):
+    """
+    Fetch prices from CoinGecko without caching
+    
+    Args:
+        coin_ids: CoinGecko IDs to fetch; falls back to top coins by market cap when empty
+        limit: Maximum number of coins to return
+    
+    Returns:
+        List of coin data with prices, or None if the API call failed
+    """
     try:
         base_url = current_app.config['COINGECKO_BASE_URL']
         
         # If user has specific assets, fetch those
-        if interested_assets and len(interested_assets) > 0:
-            # Map common names to CoinGecko IDs
-            coin_id_map = {
-                'bitcoin': 'bitcoin',
-                'btc': 'bitcoin',
-                'ethereum': 'ethereum',
-                'eth': 'ethereum',
-                'binancecoin': 'binancecoin',
-                'bnb': 'binancecoin',
-                'cardano': 'cardano',
-                'ada': 'cardano',
-                'solana': 'solana',
-                'sol': 'solana',
-                'ripple': 'ripple',
-                'xrp': 'ripple',
-                'polkadot': 'polkadot',
-                'dot': 'polkadot',
-                'dogecoin': 'dogecoin',
-                'doge': 'dogecoin',
-                'chainlink': 'chainlink',
-                'link': 'chainlink',
-                'litecoin': 'litecoin',
-                'ltc': 'litecoin'
+        if coin_ids:
+            # Fetch specific coins
+            ids_param = ','.join(coin_ids[:limit])
+            url = f"{base_url}/simple/price"
+            params = {
+                'ids': ids_param,
+                'vs_currencies': 'usd',
+                'include_24hr_change': 'true',
+                'include_market_cap': 'true'
             }
             
-            # Convert user input to CoinGecko IDs
-            coin_ids = []
-            for asset in interested_assets:
-                asset_lower = asset.lower().strip()
-                if asset_lower in coin_id_map:
-                    coin_ids.append(coin_id_map[asset_lower])
-                elif asset_lower not in coin_ids:
-                    coin_ids.append(asset_lower)
-            
-            if coin_ids:
-                # Fetch specific coins
-                ids_param = ','.join(coin_ids[:limit])
-                url = f"{base_url}/simple/price"
-                params = {
-                    'ids': ids_param,
-                    'vs_currencies': 'usd',
-                    'include_24hr_change': 'true',
-                    'include_market_cap': 'true'
-                }
-                
-                response = requests.get(url, params=params, timeout=10)
-                if response.status_code == 200:
-                    data = response.json()
-                    coins = []
-                    for coin_id, price_data in data.items():
-                        coins.append({
-                            'id': coin_id,
-                            'name': coin_id.capitalize(),
-                            'price_usd': price_data.get('usd', 0),
-                            'price_change_24h': price_data.get('usd_24h_change', 0),
-                            'market_cap': price_data.get('usd_market_cap', 0)
-                        })
-                    return coins
+            response = http_client.get(url, upstream='coingecko', params=params, timeout=10)
+            if response.status_code == 200:
+                data = response.json()
+                coins = []
+                for coin_id, price_data in data.items():
+                    coins.append(with_content_hash({
+                        'id': coin_id,
+                        'name': coin_id.capitalize(),
+                        'price_usd': price_data.get('usd', 0),
+                        'price_change_24h': price_data.get('usd_24h_change', 0),
+                        'market_cap': price_data.get('usd_market_cap', 0)
+                    }))
+                return coins
         
         # Fallback: Get top coins by market cap
         url = f"{base_url}/coins/markets"
@@ -94,44 +139,33 @@ def get_coin_prices(interested_assets=None, limit=10):
             'Accept': 'application/json'
         }
         
-        response = requests.get(url, params=params, headers=headers, timeout=15)
+        response = http_client.get(url, upstream='coingecko', params=params, headers=headers, timeout=15)
         
         if response.status_code == 200:
             data = response.json()
             if not data or len(data) == 0:
                 current_app.logger.warning("CoinGecko API returned empty data")
-                return get_fallback_coins()
+                return None
             
-            coins = []
-            for coin in data:
-                coins.append({
-                    'id': coin['id'],
-                    'name': coin['name'],
-                    'symbol': coin['symbol'].upper(),
-                    'price_usd': coin['current_price'],
-                    'price_change_24h': coin.get('price_change_percentage_24h', 0),
-                    'market_cap': coin.get('market_cap', 0),
-                    'image': coin.get('image', '')
-                })
+            coins = [format_market_coin(coin) for coin in data]
             current_app.logger.info(f"Successfully fetched {len(coins)} coins from CoinGecko")
             return coins
         elif response.status_code == 429:
             current_app.logger.error("CoinGecko API rate limit exceeded")
-            return get_fallback_coins()
+            return None
         else:
             current_app.logger.error(f"CoinGecko API error: Status {response.status_code} - {response.text[:200]}")
-            # Return fallback coins if API fails
-            return get_fallback_coins()
+            return None
         
     except requests.exceptions.Timeout:
         current_app.logger.error("CoinGecko API timeout")
-        return get_fallback_coins()
+        return None
     except requests.exceptions.RequestException as e:
         current_app.logger.error(f"CoinGecko API request error: {str(e)}")
-        return get_fallback_coins()
+        return None
     except Exception as e:
         current_app.logger.error(f"CoinGecko API error: {str(e)}", exc_info=True)
-        return get_fallback_coins()
+        return None
 
 def get_fallback_coins():
     """Return fallback coin prices if API fails"""
@@ -1,19 +1,113 @@
 """
 CryptoPanic API service for fetching cryptocurrency news
 """
-import requests
 from flask import current_app
+from app import mongo
+from app.services import http_client
+from app.services.news_store import ensure_news_ingester, get_news_store, ingest_news
 
-def get_crypto_news(limit=5):
+# Map common asset names and symbols to CryptoPanic currency codes
+CURRENCY_CODE_MAP = {
+    'bitcoin': 'BTC',
+    'btc': 'BTC',
+    'ethereum': 'ETH',
+    'eth': 'ETH',
+    'binancecoin': 'BNB',
+    'binance coin': 'BNB',
+    'bnb': 'BNB',
+    'cardano': 'ADA',
+    'ada': 'ADA',
+    'solana': 'SOL',
+    'sol': 'SOL',
+    'ripple': 'XRP',
+    'xrp': 'XRP',
+    'polkadot': 'DOT',
+    'dot': 'DOT',
+    'dogecoin': 'DOGE',
+    'doge': 'DOGE',
+    'chainlink': 'LINK',
+    'link': 'LINK',
+    'litecoin': 'LTC',
+    'ltc': 'LTC'
+}
+
+def to_currency_codes(interested_assets):
+    """
+    Convert user asset names/symbols to CryptoPanic currency codes
+
+    Assets not in CURRENCY_CODE_MAP are dropped rather than guessed, so
+    free-text entries never reach CryptoPanic as made-up codes.
+    """
+    codes = []
+    for asset in interested_assets or []:
+        if not isinstance(asset, str) or not asset.strip():
+            continue
+        code = CURRENCY_CODE_MAP.get(asset.lower().strip())
+        if code and code not in codes:
+            codes.append(code)
+    return codes
+
+def get_tracked_currency_codes():
+    """Return the default ingest currencies plus every currency users follow"""
+    codes = [code for code in current_app.config.get('NEWS_INGEST_CURRENCIES', 'BTC,ETH,BNB,ADA,SOL,XRP').split(',') if code]
+    try:
+        assets = mongo.db.users.distinct('preferences.interested_assets')
+    except Exception as e:
+        current_app.logger.error(f"Failed to load tracked assets: {str(e)}")
+        assets = []
+    for code in to_currency_codes(assets):
+        if code not in codes:
+            codes.append(code)
+    return codes
+
+def get_crypto_news(limit=5, interested_assets=None):
     """
-    Fetch latest cryptocurrency news from CryptoPanic
+    Get the latest cryptocurrency news from the local news store
+    
+    The store is filled by the background CryptoPanic ingester; only a cold
+    store triggers a synchronous ingest. When the user follows specific
+    assets, news for those currencies is merged by recency and topped up
+    with general news.
     
     Args:
         limit: Maximum number of news articles to return
+        interested_assets: User's interested assets (names or symbols)
     
     Returns:
         List of news articles
     """
+    try:
+        ensure_news_ingester()
+        store = get_news_store()
+        if len(store) == 0:
+            # Cold store: one request ingests, concurrent ones wait for it
+            ingest_news(only_if_empty=True)
+        
+        news_items = store.latest_for_currencies(to_currency_codes(interested_assets), limit)
+        if len(news_items) < limit:
+            seen = {item['id'] for item in news_items}
+            news_items += [item for item in store.latest(limit) if item['id'] not in seen][:limit - len(news_items)]
+        if news_items:
+            return news_items
+        
+        # Fallback: Return static news if nothing has been ingested
+        return get_fallback_news()
+        
+    except Exception as e:
+        current_app.logger.error(f"CryptoPanic API error: {str(e)}")
+        return get_fallback_news()
+
+def fetch_news_page(page=1, currencies=None):
+    """
+    Fetch one page of posts from CryptoPanic
+    
+    Args:
+        page: 1-based page number
+        currencies: Currency codes to filter by (defaults to NEWS_INGEST_CURRENCIES)
+    
+    Returns:
+        Tuple of (list of news items or None on failure, whether a next page exists)
+    """
     try:
         base_url = current_app.config['CRYPTOPANIC_BASE_URL']
         api_key = current_app.config.get('CRYPTOPANIC_API_KEY', '')
@@ -23,36 +117,38 @@ def get_crypto_news(limit=5):
         params = {
             'auth_token': api_key if api_key else 'public',
             'public': 'true',
-            'filter': 'hot',
-            'currencies': 'BTC,ETH,BNB,ADA,SOL,XRP'
+            'currencies': ','.join(currencies) if currencies else current_app.config.get('NEWS_INGEST_CURRENCIES', 'BTC,ETH,BNB,ADA,SOL,XRP'),
+            'page': page
         }
+        news_filter = current_app.config.get('NEWS_INGEST_FILTER', '')
+        if news_filter:
+            params['filter'] = news_filter
         
-        response = requests.get(url, params=params, timeout=10)
+        response = http_client.get(url, upstream='cryptopanic', params=params, timeout=10)
         
         if response.status_code == 200:
             data = response.json()
             results = data.get('results', [])
-            
-            news_items = []
-            for item in results[:limit]:
-                news_items.append({
-                    'id': item.get('id'),
-                    'title': item.get('title', ''),
-                    'url': item.get('url', ''),
-                    'source': item.get('source', {}).get('title', 'CryptoPanic'),
-                    'published_at': item.get('published_at', ''),
-                    'votes': item.get('votes', {}).get('positive', 0),
-                    'currencies': [c.get('code', '') for c in item.get('currencies', [])]
-                })
-            
-            return news_items
+            return [parse_news_item(item) for item in results], bool(data.get('next'))
         
-        # Fallback: Return static news if API fails
-        return get_fallback_news()
+        current_app.logger.error(f"CryptoPanic API error: Status {response.status_code}")
+        return None, False
         
     except Exception as e:
         current_app.logger.error(f"CryptoPanic API error: {str(e)}")
-        return get_fallback_news()
+        return None, False
+
+def parse_news_item(item):
+    """Convert a raw CryptoPanic post to a dashboard news item"""
+    return {
+        'id': item.get('id'),
+        'title': item.get('title', ''),
+        'url': item.get('url', ''),
+        'source': item.get('source', {}).get('title', 'CryptoPanic'),
+        'published_at': item.get('published_at', ''),
+        'votes': item.get('votes', {}).get('positive', 0),
+        'currencies': [c.get('code', '') for c in item.get('currencies', [])]
+    }
 
 def get_fallback_news():
     """Return static fallback news if API fails"""
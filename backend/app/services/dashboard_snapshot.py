@@ -0,0 +1,83 @@
+"""
+Per-user dashboard snapshots.
+
+The dashboard only changes when the user's profile changes, when they vote,
+or when shared market/news/meme/insight state moves on a refresh tick. Each
+user's serialized dashboard (and each section served on its own) is
+therefore built at most once per tick and served with a strong ETag, so
+repeat polls are answered from memory or with 304 Not Modified.
+
+The full dashboard ticks every DASHBOARD_SNAPSHOT_TTL_SECONDS; sections use
+DASHBOARD_<SECTION>_TTL_SECONDS so they can refresh at different rates.
+"""
+import hashlib
+import time
+from flask import current_app
+from app.cache import get_cache
+
+# Snapshot kinds and their default tick length in seconds
+SNAPSHOT_TTLS = {
+    'dashboard': 30,
+    'news': 60,
+    'prices': 30,
+    'insight': 3600,
+    'meme': 300,
+}
+
+def get_snapshot_cache():
+    return get_cache('dashboard_snapshots', 'DASHBOARD_SNAPSHOT_CACHE', default_ttl=3600, default_max_entries=4096)
+
+def get_tick_seconds(kind='dashboard'):
+    """Tick length for a snapshot kind"""
+    config = current_app.config
+    if kind == 'dashboard':
+        return config.get('DASHBOARD_SNAPSHOT_TTL_SECONDS', SNAPSHOT_TTLS[kind])
+    return config.get(f'DASHBOARD_{kind.upper()}_TTL_SECONDS', SNAPSHOT_TTLS[kind])
+
+def current_tick(kind='dashboard'):
+    """Index of the current refresh tick; snapshots never outlive their tick"""
+    return int(time.time() // get_tick_seconds(kind))
+
+def profile_stamp(user):
+    """What a snapshot depends on from the user document"""
+    return (user.get('profile_version', 0), str(user.get('updated_at', '')))
+
+def get_snapshot(user_id, user, kind='dashboard'):
+    """
+    Return the user's snapshot for this tick as (body, etag), or None
+
+    Snapshots built from an older profile or an earlier tick are ignored.
+    """
+    if not current_app.config.get('DASHBOARD_SNAPSHOT_ENABLED', True):
+        return None
+    snapshot = get_snapshot_cache().get((str(user_id), kind))
+    if snapshot is None or snapshot['tick'] != current_tick(kind) or snapshot['stamp'] != profile_stamp(user):
+        return None
+    return snapshot['body'], snapshot['etag']
+
+def make_etag(body):
+    """Strong ETag value for a serialized body"""
+    return hashlib.sha256(body).hexdigest()[:32]
+
+def store_snapshot(user_id, user, body, kind='dashboard'):
+    """
+    Remember a serialized dashboard (or section) for the rest of the tick
+
+    Returns:
+        The body's ETag
+    """
+    etag = make_etag(body)
+    if current_app.config.get('DASHBOARD_SNAPSHOT_ENABLED', True):
+        get_snapshot_cache().set((str(user_id), kind), {
+            'tick': current_tick(kind),
+            'stamp': profile_stamp(user),
+            'body': body,
+            'etag': etag
+        })
+    return etag
+
+def invalidate_snapshot(user_id):
+    """Drop all of a user's snapshots in this worker (e.g. after they vote)"""
+    cache = get_snapshot_cache()
+    for kind in SNAPSHOT_TTLS:
+        cache.delete((str(user_id), kind))
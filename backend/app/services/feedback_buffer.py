@@ -0,0 +1,162 @@
+"""
+Optional write-behind buffer for feedback votes.
+
+Votes are queued in process, coalesced per (user, content_type,
+content_hash) so only the latest vote is written, and flushed to
+mongo.db.feedback with one bulk_write every FEEDBACK_FLUSH_INTERVAL_MS or
+once FEEDBACK_FLUSH_SIZE votes are waiting. After a flush the voters'
+cached votes and dashboard snapshots are dropped. The queue is bounded: when it
+is full, producers wait briefly and then fall back to a synchronous write.
+Pending votes are flushed at interpreter exit (gunicorn worker recycling).
+"""
+import atexit
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from flask import current_app
+from app import mongo
+from app.services.dashboard_snapshot import invalidate_snapshot
+from app.services.ranking import forget_user_votes
+from app.tallies import apply_vote_changes
+from app.votes import write_votes
+
+class FeedbackBuffer:
+    """Bounded, coalescing vote queue flushed by a background thread"""
+
+    def __init__(self, app, flush_interval=0.5, flush_size=200, max_size=5000, put_timeout=0.05):
+        self.app = app
+        self.flush_interval = flush_interval
+        self.flush_size = flush_size
+        self.max_size = max_size
+        self.put_timeout = put_timeout
+        self._pending = OrderedDict()  # (user_id, content_type, content_hash) -> (vote, cast at)
+        self._cond = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, name='feedback-flush', daemon=True)
+        self._thread.start()
+
+    def add(self, user_id, content_type, content_hash, vote, timestamp=None):
+        """
+        Queue a vote, replacing any pending vote on the same content
+
+        timestamp is when the vote was cast (now if omitted); it is stored
+        with the vote instead of the flush time.
+
+        Returns:
+            True if queued, False if the buffer stayed full for put_timeout
+            (the caller should write synchronously)
+        """
+        key = (str(user_id), content_type, content_hash)
+        deadline = time.monotonic() + self.put_timeout
+        with self._cond:
+            while key not in self._pending and len(self._pending) >= self.max_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or self._stopped:
+                    return False
+                self._cond.notify_all()
+                self._cond.wait(remaining)
+            self._pending[key] = (vote, timestamp or datetime.utcnow())
+            self._pending.move_to_end(key)
+            if len(self._pending) >= self.flush_size:
+                self._cond.notify_all()
+        return True
+
+    def flush(self):
+        """
+        Write all pending votes in one unordered bulk upsert
+
+        Votes that fail are requeued; tallies are updated for the rest.
+
+        Returns:
+            Number of votes written
+        """
+        with self._flush_lock:
+            with self._cond:
+                batch = self._pending
+                self._pending = OrderedDict()
+                self._cond.notify_all()
+            if not batch:
+                return 0
+
+            keys = list(batch)
+            with self.app.app_context():
+                try:
+                    outcomes = write_votes(mongo.db, [key + batch[key] for key in keys])
+                except Exception as e:
+                    self.app.logger.error(f"Feedback flush of {len(batch)} votes failed: {str(e)}")
+                    self._requeue(batch)
+                    return 0
+
+                # Only the votes that failed go back in the queue; the rest are written
+                failed = OrderedDict(
+                    (key, batch[key]) for key, (status, _, _) in zip(keys, outcomes) if status == 'error'
+                )
+                if failed:
+                    self.app.logger.error(f"Feedback flush: {len(failed)} of {len(batch)} votes failed, requeued")
+                    self._requeue(failed)
+
+                try:
+                    apply_vote_changes(mongo.db, [
+                        (content_type, content_hash, previous, batch[(user_id, content_type, content_hash)][0])
+                        for (user_id, content_type, content_hash), (status, previous, _) in zip(keys, outcomes)
+                        if status != 'error'
+                    ])
+                except Exception as e:
+                    self.app.logger.error(f"Failed to update vote tallies: {str(e)}")
+
+                # Voters' cached votes and dashboards are stale only now that the votes are stored
+                for user_id in {key[0] for key, (status, _, _) in zip(keys, outcomes) if status != 'error'}:
+                    forget_user_votes(user_id)
+                    invalidate_snapshot(user_id)
+            return len(batch) - len(failed)
+
+    def _requeue(self, batch):
+        """Put a failed batch back, without overwriting newer votes"""
+        with self._cond:
+            for key, vote in batch.items():
+                self._pending.setdefault(key, vote)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if not self._stopped and len(self._pending) < self.flush_size:
+                    self._cond.wait(self.flush_interval)
+                stopped = self._stopped
+            self.flush()
+            if stopped:
+                return
+
+    def stop(self):
+        """Stop the flush thread and write everything still pending"""
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+        self._thread.join(timeout=10)
+        self.flush()
+
+    def __len__(self):
+        return len(self._pending)
+
+_buffer = None
+_buffer_lock = threading.Lock()
+
+def get_feedback_buffer():
+    """Return this worker's feedback buffer, or None if write-behind is disabled"""
+    global _buffer
+    config = current_app.config
+    if not config.get('FEEDBACK_WRITE_BEHIND', False):
+        return None
+    if _buffer is None:
+        with _buffer_lock:
+            if _buffer is None:
+                _buffer = FeedbackBuffer(
+                    current_app._get_current_object(),
+                    flush_interval=config.get('FEEDBACK_FLUSH_INTERVAL_MS', 500) / 1000,
+                    flush_size=config.get('FEEDBACK_FLUSH_SIZE', 200),
+                    max_size=config.get('FEEDBACK_BUFFER_MAX_SIZE', 5000),
+                    put_timeout=config.get('FEEDBACK_BUFFER_PUT_TIMEOUT_MS', 50) / 1000
+                )
+                atexit.register(_buffer.stop)
+    return _buffer
@@ -0,0 +1,144 @@
+"""
+Shared HTTP client for upstream APIs (CoinGecko, CryptoPanic, OpenRouter, Reddit)
+
+Keeps one pooled keep-alive session per worker process and retries failed
+calls with jittered exponential backoff, honoring 429 Retry-After headers.
+"""
+import os
+import random
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from flask import current_app
+from app.services.circuit_breaker import get_breaker, CircuitOpenError
+
+# Statuses worth retrying: rate limiting and transient server errors
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+_session = None
+_session_pid = None
+_session_lock = threading.Lock()
+
+def get_session():
+    """Return this worker's pooled session, creating it after fork if needed"""
+    global _session, _session_pid
+    pid = os.getpid()
+    if _session is None or _session_pid != pid:
+        with _session_lock:
+            if _session is None or _session_pid != pid:
+                config = current_app.config
+                adapter = HTTPAdapter(
+                    pool_connections=config.get('UPSTREAM_POOL_HOSTS', 10),
+                    pool_maxsize=config.get('UPSTREAM_POOL_MAXSIZE', 10),
+                    max_retries=0
+                )
+                session = requests.Session()
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                _session = session
+                _session_pid = pid
+    return _session
+
+def get_retry_after(response):
+    """Return the Retry-After delay in seconds, or None if absent/unparseable"""
+    value = response.headers.get('Retry-After')
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        return None
+
+def backoff_delay(attempt):
+    """Full-jitter exponential backoff for the given retry attempt (0-based)"""
+    config = current_app.config
+    base = config.get('UPSTREAM_BACKOFF_BASE_SECONDS', 0.5)
+    cap = config.get('UPSTREAM_BACKOFF_MAX_SECONDS', 5)
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+def request(method, url, upstream=None, retries=None, **kwargs):
+    """
+    Send a request through the shared session with retry/backoff
+
+    Connection errors and retryable statuses are retried. Read timeouts are
+    not, since the caller has already waited out its timeout once. When an
+    upstream name is given, the call goes through that upstream's circuit
+    breaker and fails fast with CircuitOpenError while it is open.
+
+    Args:
+        method: HTTP method
+        url: Absolute URL
+        upstream: Circuit breaker name (e.g. 'coingecko'), or None for no breaker
+        retries: Number of retries (defaults to UPSTREAM_MAX_RETRIES)
+        **kwargs: Passed through to requests.Session.request
+
+    Returns:
+        The final requests.Response
+
+    Raises:
+        requests.exceptions.RequestException if the last attempt failed
+    """
+    if upstream is None:
+        return _send_with_retries(method, url, retries, **kwargs)
+
+    breaker = get_breaker(upstream)
+    if not breaker.allow_request():
+        raise CircuitOpenError(f"Circuit for {upstream} is open")
+
+    try:
+        response = _send_with_retries(method, url, retries, **kwargs)
+    except BaseException:
+        # Any exit must record an outcome (not just RequestException), or a
+        # half-open probe would stay in flight and the breaker never recover
+        breaker.record_failure()
+        raise
+
+    if response.status_code in RETRY_STATUSES:
+        breaker.record_failure()
+    else:
+        breaker.record_success()
+    return response
+
+def _send_with_retries(method, url, retries, **kwargs):
+    """Retry loop behind request()"""
+    if retries is None:
+        retries = current_app.config.get('UPSTREAM_MAX_RETRIES', 2)
+    max_backoff = current_app.config.get('UPSTREAM_BACKOFF_MAX_SECONDS', 5)
+    session = get_session()
+
+    for attempt in range(retries + 1):
+        is_last = attempt == retries
+        try:
+            response = session.request(method, url, **kwargs)
+        except requests.exceptions.ConnectionError:
+            if is_last:
+                raise
+            time.sleep(backoff_delay(attempt))
+            continue
+
+        if response.status_code not in RETRY_STATUSES or is_last:
+            return response
+
+        delay = backoff_delay(attempt)
+        if response.status_code == 429:
+            retry_after = get_retry_after(response)
+            if retry_after is not None:
+                if retry_after > max_backoff:
+                    # Not worth holding the request that long; let the caller fall back
+                    return response
+                delay = retry_after
+
+        current_app.logger.warning(
+            f"Upstream {method} {url} returned {response.status_code}, retrying in {delay:.2f}s"
+        )
+        response.close()
+        time.sleep(delay)
+
+def get(url, **kwargs):
+    """GET through the shared upstream session"""
+    return request('GET', url, **kwargs)
+
+def post(url, **kwargs):
+    """POST through the shared upstream session"""
+    return request('POST', url, **kwargs)
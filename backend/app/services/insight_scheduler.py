@@ -0,0 +1,213 @@
+"""
+Background pre-generation of AI insights for the most popular cohorts.
+
+Periodically ranks the distinct (investor_type, interested_assets) cohorts
+in mongo.db.users by population and regenerates their insights before the
+cached copy expires, within a per-run rate budget. Dashboard requests then
+hit a warm cache instead of waiting on OpenRouter.
+
+Every worker runs the loop, but only the holder of a lease in
+mongo.db.scheduler_leases calls OpenRouter, so the budget applies to the
+whole deployment rather than per worker. The holder stores what it
+generates in mongo.db.ai_insights; the other workers copy those insights
+into their own caches on each run.
+"""
+import json
+import os
+import socket
+import threading
+import time
+from datetime import datetime, timedelta
+from flask import current_app
+from pymongo.errors import DuplicateKeyError
+from app import mongo
+from app.services.ai_service import get_cohort_key, get_insight_cache, request_ai_insight
+
+INSIGHTS_COLLECTION = 'ai_insights'
+LEASES_COLLECTION = 'scheduler_leases'
+PREGEN_LEASE = 'insight-pregen'
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+def ensure_insight_scheduler():
+    """Start the insight pre-generation thread for this worker if enabled"""
+    global _scheduler
+    config = current_app.config
+    if not config.get('AI_PREGEN_ENABLED', True) or not config.get('OPENROUTER_API_KEY', ''):
+        return
+    if _scheduler is not None:
+        return
+    with _scheduler_lock:
+        if _scheduler is None:
+            app = current_app._get_current_object()
+            _scheduler = threading.Thread(
+                target=_scheduler_loop,
+                args=(app,),
+                name='insight-pregen',
+                daemon=True
+            )
+            _scheduler.start()
+
+def _scheduler_loop(app):
+    """Run pre-generation forever at the configured interval"""
+    interval = app.config.get('AI_PREGEN_INTERVAL_SECONDS', 900)
+    while True:
+        with app.app_context():
+            try:
+                pregenerate_insights()
+            except Exception as e:
+                app.logger.error(f"Insight pre-generation failed: {str(e)}", exc_info=True)
+        time.sleep(interval)
+
+def lease_holder():
+    """Identity of this worker for scheduler leases"""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+def acquire_lease(name, seconds):
+    """
+    Take or renew a named lease for this worker
+
+    The lease is granted if it is free, expired or already ours; a lease
+    held by another worker makes the upsert collide on _id.
+
+    Returns:
+        True if this worker holds the lease for the next `seconds`
+    """
+    now = datetime.utcnow()
+    try:
+        mongo.db[LEASES_COLLECTION].update_one(
+            {'_id': name, '$or': [{'holder': lease_holder()}, {'expires_at': {'$lt': now}}]},
+            {'$set': {'holder': lease_holder(), 'expires_at': now + timedelta(seconds=seconds)}},
+            upsert=True
+        )
+        return True
+    except DuplicateKeyError:
+        return False
+
+def cohort_id(key):
+    """Document _id for a cohort key in the shared insights collection"""
+    investor_type, assets = key
+    return json.dumps([investor_type, list(assets)])
+
+def get_popular_cohorts(limit):
+    """
+    Rank user cohorts by population
+
+    Returns:
+        List of (cohort_key, preferences, user_count) tuples, most popular first
+    """
+    pipeline = [
+        {'$match': {'preferences': {'$ne': None}}},
+        {'$group': {
+            '_id': {
+                'investor_type': '$preferences.investor_type',
+                'interested_assets': '$preferences.interested_assets'
+            },
+            'count': {'$sum': 1}
+        }}
+    ]
+
+    # Several raw asset lists can normalize to the same cohort, so merge in Python
+    cohorts = {}
+    for group in mongo.db.users.aggregate(pipeline):
+        preferences = {
+            'investor_type': group['_id'].get('investor_type'),
+            'interested_assets': group['_id'].get('interested_assets') or []
+        }
+        key = get_cohort_key(preferences)
+        if key in cohorts:
+            cohorts[key][2] += group['count']
+        else:
+            cohorts[key] = [key, preferences, group['count']]
+
+    ranked = sorted(cohorts.values(), key=lambda cohort: cohort[2], reverse=True)
+    return [tuple(cohort) for cohort in ranked[:limit]]
+
+def load_shared_insights(keys):
+    """
+    Read insights generated by the lease holder
+
+    Returns:
+        Dict mapping cohort key to (insight, generated_at)
+    """
+    ids = {cohort_id(key): key for key in keys}
+    if not ids:
+        return {}
+    return {
+        ids[doc['_id']]: (doc['insight'], doc['generated_at'])
+        for doc in mongo.db[INSIGHTS_COLLECTION].find({'_id': {'$in': list(ids)}})
+    }
+
+def store_shared_insight(key, insight):
+    """Publish a generated insight to the other workers"""
+    mongo.db[INSIGHTS_COLLECTION].replace_one(
+        {'_id': cohort_id(key)},
+        {'insight': insight, 'generated_at': datetime.utcnow()},
+        upsert=True
+    )
+
+def pregenerate_insights():
+    """
+    Regenerate insights for popular cohorts that are missing or about to expire
+
+    Only the lease holder calls OpenRouter; other workers copy the shared
+    insights into their caches.
+
+    Returns:
+        Number of insights generated in this run (0 when not the lease holder)
+    """
+    config = current_app.config
+    max_cohorts = config.get('AI_PREGEN_MAX_COHORTS', 50)
+    max_calls = config.get('AI_PREGEN_MAX_CALLS_PER_RUN', 20)
+    min_spacing = config.get('AI_PREGEN_MIN_INTERVAL_SECONDS', 2)
+    refresh_ahead = config.get('AI_PREGEN_REFRESH_AHEAD_SECONDS', 3600)
+    # Held across two runs so one late run does not hand the lease over
+    lease_seconds = 2 * config.get('AI_PREGEN_INTERVAL_SECONDS', 900)
+
+    cache = get_insight_cache()
+    cohorts = get_popular_cohorts(max_cohorts)
+    shared = load_shared_insights([key for key, _, _ in cohorts])
+    now = datetime.utcnow()
+
+    def shared_age(key):
+        return max(0.0, (now - shared[key][1]).total_seconds()) if key in shared else None
+
+    if not acquire_lease(PREGEN_LEASE, lease_seconds):
+        # Another worker generates; warm this worker's cache from its results
+        # (backdated, so every worker expires the cohort at the same time)
+        for key, (insight, _) in shared.items():
+            if shared_age(key) < cache.ttl and cache.get(key) != insight:
+                cache.set(key, insight, age=shared_age(key))
+        return 0
+
+    generated = 0
+    last_call = 0.0
+
+    for key, preferences, user_count in cohorts:
+        age = shared_age(key)
+        if age is not None and age < cache.ttl - refresh_ahead:
+            if cache.get(key) is None:
+                cache.set(key, shared[key][0], age=age)
+            continue
+
+        if generated >= max_calls:
+            break
+
+        # Spread calls out to stay within the rate budget
+        wait = min_spacing - (time.monotonic() - last_call)
+        if wait > 0:
+            time.sleep(wait)
+        last_call = time.monotonic()
+
+        insight = request_ai_insight(preferences)
+        if insight is None:
+            # OpenRouter is failing; try again next run
+            break
+
+        cache.set(key, insight)
+        store_shared_insight(key, insight)
+        generated += 1
+        current_app.logger.info(f"Pre-generated insight for cohort {key} ({user_count} users)")
+
+    return generated
@@ -0,0 +1,185 @@
+"""
+Global CoinGecko market snapshot shared by all users in a worker.
+
+A background thread periodically pulls the top-N markets plus the union of
+every asset users are interested in, using batched /coins/markets calls.
+Entries are formatted and content-hashed once per refresh; per-user price
+lists are then sliced from memory (as copies) with no network I/O.
+"""
+import threading
+import time
+from flask import current_app
+from app.services import http_client
+from app import mongo
+from app.utils import price_content_hash
+
+# CoinGecko accepts up to 250 results per /coins/markets page
+MARKETS_PAGE_SIZE = 250
+
+_snapshot = {
+    'top': [],        # formatted top-N entries, ordered by market cap
+    'prices': {},     # coin id -> /simple/price-shaped entry
+    'updated_at': None
+}
+_snapshot_lock = threading.Lock()
+_refresher = None
+_refresher_lock = threading.Lock()
+
+def ensure_snapshot_refresher():
+    """Start the background snapshot refresher for this worker if enabled"""
+    global _refresher
+    if not current_app.config.get('MARKET_SNAPSHOT_ENABLED', True):
+        return
+    if _refresher is not None:
+        return
+    with _refresher_lock:
+        if _refresher is None:
+            app = current_app._get_current_object()
+            _refresher = threading.Thread(
+                target=_refresh_loop,
+                args=(app,),
+                name='market-snapshot',
+                daemon=True
+            )
+            _refresher.start()
+
+def _refresh_loop(app):
+    """Refresh the snapshot forever at the configured interval"""
+    interval = app.config.get('MARKET_SNAPSHOT_INTERVAL_SECONDS', 60)
+    while True:
+        with app.app_context():
+            try:
+                refresh_snapshot()
+            except Exception as e:
+                app.logger.error(f"Market snapshot refresh failed: {str(e)}", exc_info=True)
+        time.sleep(interval)
+
+def get_tracked_coin_ids():
+    """Return the union of CoinGecko IDs that any user is interested in"""
+    from app.services.coingecko import to_coin_ids
+    try:
+        assets = mongo.db.users.distinct('preferences.interested_assets')
+    except Exception as e:
+        current_app.logger.error(f"Failed to load tracked assets: {str(e)}")
+        return []
+    return to_coin_ids([asset for asset in assets if isinstance(asset, str)])
+
+def fetch_markets(params):
+    """Call /coins/markets and return the list of entries, or None on failure"""
+    base_url = current_app.config['COINGECKO_BASE_URL']
+    headers = {
+        'User-Agent': 'CryptoDashboard/1.0',
+        'Accept': 'application/json'
+    }
+    query = {
+        'vs_currency': 'usd',
+        'order': 'market_cap_desc',
+        'sparkline': False,
+        'page': 1
+    }
+    query.update(params)
+
+    response = http_client.get(f"{base_url}/coins/markets", upstream='coingecko', params=query, headers=headers, timeout=15)
+    if response.status_code == 200:
+        return response.json()
+
+    current_app.logger.error(f"CoinGecko snapshot error: Status {response.status_code} - {response.text[:200]}")
+    return None
+
+def refresh_snapshot():
+    """
+    Pull top-N markets plus all tracked assets and swap in a new snapshot
+
+    Returns:
+        Number of coins in the new snapshot, or 0 if the refresh failed
+    """
+    top_n = current_app.config.get('MARKET_SNAPSHOT_TOP_N', 100)
+    top = fetch_markets({'per_page': min(top_n, MARKETS_PAGE_SIZE)})
+    if not top:
+        return 0
+
+    coins = {coin['id']: coin for coin in top}
+
+    # Batch any tracked assets that are not already in the top-N
+    missing = [coin_id for coin_id in get_tracked_coin_ids() if coin_id not in coins]
+    for i in range(0, len(missing), MARKETS_PAGE_SIZE):
+        batch = missing[i:i + MARKETS_PAGE_SIZE]
+        extra = fetch_markets({'ids': ','.join(batch), 'per_page': len(batch)})
+        for coin in extra or []:
+            coins[coin['id']] = coin
+
+    # Format and hash once here rather than on every request
+    formatted_top = [format_market_coin(coin) for coin in top]
+    prices = {coin_id: format_snapshot_price(coin) for coin_id, coin in coins.items()}
+
+    with _snapshot_lock:
+        _snapshot['top'] = formatted_top
+        _snapshot['prices'] = prices
+        _snapshot['updated_at'] = time.time()
+
+    current_app.logger.info(f"Market snapshot refreshed with {len(coins)} coins")
+    return len(coins)
+
+def get_snapshot_prices(coin_ids, limit=10):
+    """
+    Assemble a price list from the in-memory snapshot
+
+    Args:
+        coin_ids: CoinGecko IDs the user is interested in (top coins if empty)
+        limit: Maximum number of coins to return
+
+    Returns:
+        List of coin data, or None if the snapshot is missing or stale or
+        has none of the requested coins
+    """
+    max_age = current_app.config.get('MARKET_SNAPSHOT_MAX_AGE_SECONDS', 600)
+    with _snapshot_lock:
+        top = _snapshot['top']
+        prices = _snapshot['prices']
+        updated_at = _snapshot['updated_at']
+
+    if updated_at is None or time.time() - updated_at > max_age:
+        return None
+
+    # Callers annotate coins in place, so hand out copies of snapshot entries
+    if not coin_ids:
+        if len(top) < limit:
+            return None
+        return [dict(coin) for coin in top[:limit]]
+
+    # Like /simple/price, ids the snapshot does not know are dropped; when it
+    # knows none of them, fall through to a /simple/price fetch
+    result = [dict(prices[coin_id]) for coin_id in dict.fromkeys(coin_ids) if coin_id in prices]
+    return result or None
+
+def format_snapshot_price(coin):
+    """
+    Format a raw /coins/markets entry like a /simple/price result
+
+    Same shape as fetch_coin_prices returns, so content hashes stay stable
+    whichever source served the prices.
+    """
+    return with_content_hash({
+        'id': coin['id'],
+        'name': coin['id'].capitalize(),
+        'price_usd': coin.get('current_price') or 0,
+        'price_change_24h': coin.get('price_change_percentage_24h') or 0,
+        'market_cap': coin.get('market_cap') or 0
+    })
+
+def format_market_coin(coin):
+    """Format a raw /coins/markets entry for the dashboard"""
+    return with_content_hash({
+        'id': coin['id'],
+        'name': coin['name'],
+        'symbol': coin['symbol'].upper(),
+        'price_usd': coin['current_price'],
+        'price_change_24h': coin.get('price_change_percentage_24h', 0),
+        'market_cap': coin.get('market_cap', 0),
+        'image': coin.get('image', '')
+    })
+
+def with_content_hash(coin):
+    """Attach the coin's content hash"""
+    coin['content_hash'] = price_content_hash(coin)
+    return coin
@@ -0,0 +1,129 @@
+"""
+Prefetched pool of Reddit memes.
+
+A background thread fetches all meme subreddits in parallel, keeps the
+image posts deduplicated by post id, and evicts entries by age and pool
+size. Request handlers only sample from memory.
+"""
+import random
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from flask import current_app
+from app.utils import meme_content_hash
+from app.services.circuit_breaker import CircuitOpenError
+
+class MemePool:
+    """Deduplicated, size- and age-bounded pool of meme dicts"""
+
+    def __init__(self, max_size=500, max_age=6 * 3600):
+        self.max_size = max_size
+        self.max_age = max_age
+        self._entries = OrderedDict()  # post id -> (meme, added_at), oldest first
+        self._sample = ()              # snapshot of memes for O(1) random picks
+        self._lock = threading.Lock()
+
+    def add_many(self, memes):
+        """Add memes not already in the pool, then evict old and excess entries"""
+        now = time.time()
+        with self._lock:
+            for meme in memes:
+                if meme['id'] not in self._entries:
+                    meme['content_hash'] = meme_content_hash(meme)
+                    self._entries[meme['id']] = (meme, now)
+
+            while self._entries:
+                oldest_id, (_, added_at) = next(iter(self._entries.items()))
+                if now - added_at <= self.max_age and len(self._entries) <= self.max_size:
+                    break
+                del self._entries[oldest_id]
+
+            self._sample = tuple(meme for meme, _ in self._entries.values())
+
+    def random_meme(self):
+        """Return a copy of a random pooled meme, or None if the pool is empty"""
+        sample = self._sample
+        if not sample:
+            return None
+        return dict(random.choice(sample))
+
+    def random_memes(self, count):
+        """Return copies of up to count distinct random pooled memes"""
+        sample = self._sample
+        return [dict(meme) for meme in random.sample(sample, min(count, len(sample)))]
+
+    def __len__(self):
+        return len(self._sample)
+
+_pool = None
+_refresher = None
+_pool_lock = threading.Lock()
+
+def get_meme_pool():
+    """Return this worker's meme pool"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = MemePool(
+                    max_size=current_app.config.get('MEME_POOL_MAX_SIZE', 500),
+                    max_age=current_app.config.get('MEME_POOL_MAX_AGE_SECONDS', 6 * 3600)
+                )
+    return _pool
+
+def ensure_meme_pool_refresher():
+    """Start the background pool refresher for this worker if enabled"""
+    global _refresher
+    if not current_app.config.get('MEME_POOL_ENABLED', True) or _refresher is not None:
+        return
+    with _pool_lock:
+        if _refresher is None:
+            app = current_app._get_current_object()
+            _refresher = threading.Thread(
+                target=_refresh_loop,
+                args=(app,),
+                name='meme-pool',
+                daemon=True
+            )
+            _refresher.start()
+
+def _refresh_loop(app):
+    """Refresh the pool forever at the configured interval"""
+    interval = app.config.get('MEME_POOL_REFRESH_SECONDS', 300)
+    while True:
+        with app.app_context():
+            try:
+                refresh_meme_pool()
+            except Exception as e:
+                app.logger.error(f"Meme pool refresh failed: {str(e)}", exc_info=True)
+        time.sleep(interval)
+
+def refresh_meme_pool():
+    """
+    Fetch every meme subreddit in parallel and merge the results into the pool
+
+    Returns:
+        Number of memes in the pool after the refresh
+    """
+    from app.services.meme_service import SUBREDDITS, fetch_subreddit_memes
+
+    app = current_app._get_current_object()
+
+    def fetch(subreddit):
+        with app.app_context():
+            try:
+                return fetch_subreddit_memes(subreddit)
+            except CircuitOpenError:
+                return []
+            except Exception as e:
+                app.logger.error(f"Error fetching from r/{subreddit}: {str(e)}")
+                return []
+
+    with ThreadPoolExecutor(max_workers=len(SUBREDDITS), thread_name_prefix='meme-fetch') as executor:
+        results = list(executor.map(fetch, SUBREDDITS))
+
+    pool = get_meme_pool()
+    pool.add_many(meme for memes in results for meme in memes)
+    app.logger.info(f"Meme pool refreshed: {len(pool)} memes")
+    return len(pool)
@@ -0,0 +1,113 @@
+"""
+In-memory index of the static meme corpus (data/memes.json).
+
+The corpus is parsed once per worker into a compact list of tuples and only
+reparsed when the file's mtime changes, so random picks are O(1) and never
+touch the JSON file on the request path.
+"""
+import json
+import os
+import random
+import threading
+import time
+from flask import current_app
+from app.utils import meme_content_hash
+
+MEMES_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    'data',
+    'memes.json'
+)
+
+# Tuple layout used for each indexed meme
+FIELDS = ('id', 'url', 'title', 'source', 'description', 'content_hash')
+
+class MemeStore:
+    """Preindexed meme corpus that reloads when the backing file changes"""
+
+    def __init__(self, path, check_interval=5):
+        self.path = path
+        self.check_interval = check_interval
+        self._memes = ()
+        self._mtime = None
+        self._last_check = 0.0
+        self._lock = threading.Lock()
+
+    def _maybe_reload(self):
+        """Reload the corpus if the file's mtime changed since the last load"""
+        now = time.monotonic()
+        if self._mtime is not None and now - self._last_check < self.check_interval:
+            return
+
+        with self._lock:
+            if self._mtime is not None and now - self._last_check < self.check_interval:
+                return
+            self._last_check = now
+            try:
+                mtime = os.stat(self.path).st_mtime
+            except OSError:
+                # Keep serving whatever was loaded before the file disappeared
+                if self._mtime is None:
+                    self._mtime = 0
+                return
+            if mtime == self._mtime:
+                return
+
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    raw = json.load(f)
+            except (OSError, ValueError) as e:
+                # Keep the previous corpus until the file is fixed
+                current_app.logger.error(f"Failed to load memes from {self.path}: {str(e)}")
+                self._mtime = mtime
+                return
+
+            self._memes = tuple(index_meme(meme) for meme in raw or [] if isinstance(meme, dict))
+            self._mtime = mtime
+            current_app.logger.info(f"Loaded {len(self._memes)} memes from {self.path}")
+
+    def random_meme(self):
+        """Return a random meme dict, or None if the corpus is empty"""
+        self._maybe_reload()
+        memes = self._memes
+        if not memes:
+            return None
+        return dict(zip(FIELDS, memes[random.randrange(len(memes))]))
+
+    def random_memes(self, count):
+        """Return up to count distinct random meme dicts"""
+        self._maybe_reload()
+        memes = self._memes
+        return [dict(zip(FIELDS, meme)) for meme in random.sample(memes, min(count, len(memes)))]
+
+    def __len__(self):
+        self._maybe_reload()
+        return len(self._memes)
+
+def index_meme(meme):
+    """Convert a raw corpus entry to the compact tuple form, with its content hash"""
+    meme_id = meme.get('id', 'meme-1')
+    url = meme.get('url', '')
+    return (
+        meme_id,
+        url,
+        meme.get('title', 'Crypto Meme'),
+        meme.get('source', 'Reddit'),
+        meme.get('description', ''),
+        meme_content_hash({'id': meme_id, 'url': url})
+    )
+
+_store = None
+_store_lock = threading.Lock()
+
+def get_meme_store():
+    """Return this worker's meme store"""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = MemeStore(
+                    current_app.config.get('MEME_CORPUS_PATH') or MEMES_PATH,
+                    check_interval=current_app.config.get('MEME_CORPUS_CHECK_SECONDS', 5)
+                )
+    return _store
@@ -0,0 +1,198 @@
+"""
+Local store of ingested CryptoPanic news.
+
+A background thread polls CryptoPanic incrementally, only following further
+pages while they still contain posts newer than the newest one seen. Posts
+are upserted into a bounded in-memory ring, deduplicated by id and indexed
+by currency, so the dashboard reads the latest items without network I/O.
+"""
+import bisect
+import heapq
+import threading
+import time
+from flask import current_app
+from app.utils import news_content_hash
+
+class NewsStore:
+    """Bounded, deduplicated news ring ordered by published_at"""
+
+    def __init__(self, max_items=500):
+        self.max_items = max_items
+        self._items = {}        # id -> news item
+        self._order = []        # (published_at, id), oldest first
+        self._by_currency = {}  # currency code -> [(published_at, id)], oldest first
+        self._lock = threading.Lock()
+
+    def upsert_many(self, items):
+        """
+        Insert new items and refresh existing ones (e.g. vote counts)
+
+        Returns:
+            Number of items that were not already in the store
+        """
+        inserted = 0
+        with self._lock:
+            for item in items:
+                item_id = item.get('id')
+                if item_id is None:
+                    continue
+                item['content_hash'] = news_content_hash(item)
+                existing = self._items.get(item_id)
+                if existing is not None:
+                    # Re-index from scratch: published_at or the currency tags may have changed
+                    self._remove(item_id)
+                    self._insert(item)
+                    continue
+                elif len(self._order) >= self.max_items and (item.get('published_at') or '') <= self._order[0][0]:
+                    # Older than everything we keep; it would be evicted immediately
+                    continue
+                self._insert(item)
+                inserted += 1
+
+            # Drop the oldest items past capacity
+            while len(self._order) > self.max_items:
+                self._remove(self._order[0][1])
+        return inserted
+
+    def _insert(self, item):
+        entry = (item.get('published_at') or '', item['id'])
+        self._items[item['id']] = item
+        bisect.insort(self._order, entry)
+        for code in item.get('currencies') or []:
+            bisect.insort(self._by_currency.setdefault(code, []), entry)
+
+    def _remove(self, item_id):
+        item = self._items.pop(item_id)
+        entry = (item.get('published_at') or '', item_id)
+        del self._order[bisect.bisect_left(self._order, entry)]
+        for code in item.get('currencies') or []:
+            entries = self._by_currency.get(code)
+            if not entries:
+                continue
+            del entries[bisect.bisect_left(entries, entry)]
+            if not entries:
+                del self._by_currency[code]
+
+    def latest(self, limit):
+        """Return copies of the newest items, newest first"""
+        with self._lock:
+            return [dict(self._items[item_id]) for _, item_id in reversed(self._order[-limit:])]
+
+    def latest_for_currency(self, code, limit):
+        """Return copies of the newest items tagged with a currency, newest first"""
+        with self._lock:
+            entries = self._by_currency.get(code, [])
+            return [dict(self._items[item_id]) for _, item_id in reversed(entries[-limit:])]
+
+    def latest_for_currencies(self, codes, limit):
+        """
+        Return the newest items tagged with any of the currencies, newest first
+
+        Does a k-way merge of the per-currency lists by recency, skipping
+        items tagged with more than one of the requested currencies.
+        """
+        with self._lock:
+            streams = [reversed(self._by_currency[code]) for code in set(codes) if code in self._by_currency]
+            merged = heapq.merge(*streams, reverse=True)
+            result = []
+            seen = set()
+            for _, item_id in merged:
+                if item_id in seen:
+                    continue
+                seen.add(item_id)
+                result.append(dict(self._items[item_id]))
+                if len(result) >= limit:
+                    break
+            return result
+
+    def newest_published_at(self):
+        """Return the newest published_at seen, or None if the store is empty"""
+        with self._lock:
+            return self._order[-1][0] if self._order else None
+
+    def __contains__(self, item_id):
+        return item_id in self._items
+
+    def __len__(self):
+        return len(self._order)
+
+_store = None
+_ingester = None
+_store_lock = threading.Lock()
+_ingest_lock = threading.Lock()
+
+def get_news_store():
+    """Return this worker's news store"""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = NewsStore(max_items=current_app.config.get('NEWS_STORE_MAX_ITEMS', 500))
+    return _store
+
+def ensure_news_ingester():
+    """Start the background news ingester for this worker if enabled"""
+    global _ingester
+    if not current_app.config.get('NEWS_INGEST_ENABLED', True) or _ingester is not None:
+        return
+    with _store_lock:
+        if _ingester is None:
+            app = current_app._get_current_object()
+            _ingester = threading.Thread(
+                target=_ingest_loop,
+                args=(app,),
+                name='news-ingest',
+                daemon=True
+            )
+            _ingester.start()
+
+def _ingest_loop(app):
+    """Poll CryptoPanic forever at the configured interval"""
+    interval = app.config.get('NEWS_INGEST_INTERVAL_SECONDS', 120)
+    while True:
+        with app.app_context():
+            try:
+                ingest_news()
+            except Exception as e:
+                app.logger.error(f"News ingestion failed: {str(e)}", exc_info=True)
+        time.sleep(interval)
+
+def ingest_news(only_if_empty=False):
+    """
+    Pull posts newer than the newest one stored and upsert them
+
+    Ingests are serialized. With only_if_empty (a cold store on the request
+    path) callers that waited for another ingest skip theirs, so concurrent
+    requests at worker start share one CryptoPanic fetch.
+
+    Returns:
+        Number of newly stored posts
+    """
+    from app.services.cryptopanic import fetch_news_page, get_tracked_currency_codes
+
+    max_pages = current_app.config.get('NEWS_INGEST_MAX_PAGES', 3)
+    store = get_news_store()
+
+    with _ingest_lock:
+        if only_if_empty and len(store):
+            return 0
+        currencies = get_tracked_currency_codes()
+        watermark = store.newest_published_at()
+        inserted = 0
+        page = 1
+        while page <= max_pages:
+            items, has_next = fetch_news_page(page, currencies)
+            if items is None:
+                break
+            inserted += store.upsert_many(items)
+
+            # Older pages can only hold posts we already have
+            if not has_next or watermark is None or not any(
+                (item.get('published_at') or '') > watermark for item in items
+            ):
+                break
+            page += 1
+
+    if inserted:
+        current_app.logger.info(f"Ingested {inserted} new CryptoPanic posts ({len(store)} stored)")
+    return inserted
@@ -0,0 +1,173 @@
+"""
+Password hashing off the request workers.
+
+bcrypt is CPU-bound (~250ms at cost 12), so hashing and verification run in
+a small per-worker process pool instead of the gunicorn worker itself. The
+number of in-flight jobs is bounded; when the pool is saturated callers get
+PasswordHasherBusy immediately so the route can answer 503 rather than
+queueing logins behind each other. The bound (PASSWORD_HASH_MAX_PENDING)
+is per gunicorn worker, since each worker has its own pool. A pool whose
+process died is replaced on the next call. Hashes made with an outdated
+cost are transparently replaced after a successful login.
+"""
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from flask import current_app
+from app.queries import replace_password_hash
+from app.utils import hash_password, verify_password, password_hash_rounds
+
+class PasswordHasherBusy(Exception):
+    """Raised when the hashing pool is saturated or too slow to answer"""
+
+def get_mp_context():
+    """
+    Start method for hashing processes
+
+    forkserver avoids forking a threaded gunicorn worker directly (which could
+    copy held locks); it does not exist on Windows, where spawn is used.
+    """
+    if 'forkserver' in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context('forkserver')
+    return multiprocessing.get_context('spawn')
+
+class PasswordHasher:
+    """Process pool for bcrypt with a bounded number of pending jobs"""
+
+    def __init__(self, workers=2, max_pending=16, timeout=10):
+        self.workers = workers
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._executor_lock = threading.Lock()
+        self._executor = self._new_executor() if workers > 0 else None
+
+    def _new_executor(self):
+        return ProcessPoolExecutor(max_workers=self.workers, mp_context=get_mp_context())
+
+    def _replace_broken(self, executor):
+        """Swap in a fresh pool if executor (which raised BrokenProcessPool) is still current"""
+        with self._executor_lock:
+            if self._executor is executor:
+                executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = self._new_executor()
+
+    def submit(self, fn, *args):
+        """
+        Queue fn(*args) on the pool and return its future
+
+        A broken pool (a worker process died) is replaced and the job
+        submitted once more.
+
+        Raises:
+            PasswordHasherBusy: if max_pending jobs are already queued or running
+        """
+        if not self._slots.acquire(blocking=False):
+            raise PasswordHasherBusy('Password hashing pool is saturated')
+        try:
+            executor = self._executor
+            try:
+                future = executor.submit(fn, *args)
+            except BrokenProcessPool:
+                self._replace_broken(executor)
+                future = self._executor.submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    @property
+    def inline(self):
+        """True when configured without worker processes (hashing runs in the caller)"""
+        return self._executor is None
+
+    def run(self, fn, *args):
+        """Run fn(*args) on the pool (or inline with no workers) and wait for the result"""
+        if self.inline:
+            return fn(*args)
+        for attempt in range(2):
+            executor = self._executor
+            future = self.submit(fn, *args)
+            try:
+                return future.result(timeout=self.timeout)
+            except FutureTimeoutError:
+                raise PasswordHasherBusy(f'Password hashing took longer than {self.timeout}s')
+            except BrokenProcessPool:
+                # The process running the job died; retry once on a fresh pool
+                self._replace_broken(executor)
+                if attempt:
+                    raise
+
+    def hash(self, password, rounds):
+        """bcrypt-hash a password off the request thread"""
+        return self.run(hash_password, password, rounds)
+
+    def verify(self, password, password_hash):
+        """Check a password against a bcrypt hash off the request thread"""
+        return self.run(verify_password, password, password_hash)
+
+    def shutdown(self):
+        """Stop the worker processes, dropping queued jobs"""
+        if not self.inline:
+            with self._executor_lock:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+
+_hasher = None
+_hasher_pid = None
+_hasher_lock = threading.Lock()
+
+def get_password_hasher():
+    """Return this worker's password hasher, creating it after fork if needed"""
+    global _hasher, _hasher_pid
+    pid = os.getpid()
+    if _hasher is None or _hasher_pid != pid:
+        with _hasher_lock:
+            if _hasher is None or _hasher_pid != pid:
+                config = current_app.config
+                _hasher = PasswordHasher(
+                    workers=config.get('PASSWORD_HASH_WORKERS', 2),
+                    max_pending=config.get('PASSWORD_HASH_MAX_PENDING', 16),
+                    timeout=config.get('PASSWORD_HASH_TIMEOUT_SECONDS', 10)
+                )
+                _hasher_pid = pid
+    return _hasher
+
+def get_bcrypt_rounds():
+    """Configured bcrypt cost for new hashes"""
+    return current_app.config.get('BCRYPT_ROUNDS', 12)
+
+def needs_rehash(password_hash):
+    """True if a stored hash was made with a different cost than configured"""
+    return password_hash_rounds(password_hash) != get_bcrypt_rounds()
+
+def rehash_in_background(user_id, password, old_hash):
+    """
+    Replace a user's hash with one at the configured cost, without blocking
+
+    Best effort: skipped when the pool is busy or hashing runs inline (it
+    would block the request thread), and the update only applies if the
+    stored hash is still old_hash.
+    """
+    app = current_app._get_current_object()
+    hasher = get_password_hasher()
+    rounds = get_bcrypt_rounds()
+    if hasher.inline:
+        app.logger.info(f"Skipping password rehash for user {user_id}: no hashing pool")
+        return
+
+    def store(future):
+        with app.app_context():
+            try:
+                replace_password_hash(user_id, old_hash, future.result())
+                app.logger.info(f"Rehashed password for user {user_id} at cost {rounds}")
+            except Exception as e:
+                app.logger.error(f"Password rehash failed for user {user_id}: {str(e)}")
+
+    try:
+        hasher.submit(hash_password, password, rounds).add_done_callback(store)
+    except PasswordHasherBusy:
+        app.logger.info(f"Skipping password rehash for user {user_id}: hashing pool busy")
+    except Exception as e:
+        app.logger.error(f"Password rehash failed for user {user_id}: {str(e)}")
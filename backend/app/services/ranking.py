@@ -0,0 +1,98 @@
+"""
+Feedback-driven ranking of dashboard content.
+
+Candidates are reordered by their precomputed vote score (from the
+vote_tallies collection) plus a boost for items the user upvoted, and items
+the user downvoted are hidden. Both inputs are cached per worker as plain
+dicts and frozensets, so ranking a request is a handful of hash lookups.
+"""
+from bson import ObjectId
+from flask import current_app
+from app import mongo
+from app.cache import get_cache
+from app.tallies import TALLIES_COLLECTION
+
+def get_score_cache():
+    """Cache holding the content_hash -> score table (single entry)"""
+    return get_cache('vote_scores', 'VOTE_SCORE_CACHE', default_ttl=60, default_stale_ttl=600, default_max_entries=1)
+
+def get_user_vote_cache():
+    """Cache of each user's (upvoted, downvoted) content hashes, keyed by user id"""
+    return get_cache('user_votes', 'USER_VOTE_CACHE', default_ttl=30, default_stale_ttl=300, default_max_entries=4096)
+
+def load_scores():
+    """Load non-zero tally scores as {content_hash: score}"""
+    limit = current_app.config.get('RANKING_MAX_TALLIES', 50000)
+    cursor = mongo.db[TALLIES_COLLECTION].find(
+        {'score': {'$ne': 0}},
+        {'_id': 0, 'content_hash': 1, 'score': 1}
+    ).limit(limit)
+    return {doc['content_hash']: doc['score'] for doc in cursor}
+
+def load_user_votes(user_id):
+    """Load the user's most recent votes as (upvoted, downvoted) frozensets"""
+    limit = current_app.config.get('RANKING_USER_VOTES_LIMIT', 1000)
+    cursor = mongo.db.feedback.find(
+        {'user_id': ObjectId(user_id)},
+        {'_id': 0, 'content_hash': 1, 'vote': 1}
+    ).sort([('timestamp', -1), ('_id', -1)]).limit(limit)
+    upvoted = set()
+    downvoted = set()
+    for doc in cursor:
+        if doc.get('vote') == 1:
+            upvoted.add(doc['content_hash'])
+        elif doc.get('vote') == -1:
+            downvoted.add(doc['content_hash'])
+    return frozenset(upvoted), frozenset(downvoted)
+
+def forget_user_votes(user_id):
+    """Drop a user's cached votes after they vote (this worker only)"""
+    get_user_vote_cache().delete(str(user_id))
+
+class Ranker:
+    """Ranks tagged content for one user"""
+
+    def __init__(self, scores=None, upvoted=frozenset(), downvoted=frozenset(), upvote_boost=1):
+        self.scores = scores or {}
+        self.upvoted = upvoted
+        self.downvoted = downvoted
+        self.upvote_boost = upvote_boost
+
+    def is_hidden(self, item):
+        return item.get('content_hash') in self.downvoted
+
+    def score(self, item):
+        content_hash = item.get('content_hash')
+        score = self.scores.get(content_hash, 0)
+        if content_hash in self.upvoted:
+            score += self.upvote_boost
+        return score
+
+    def rank(self, items, limit=None):
+        """
+        Drop downvoted items and sort the rest by score, highest first
+
+        The sort is stable, so ties keep their incoming (recency or random)
+        order. If every candidate is hidden the original order is kept, so
+        a section never comes back empty.
+        """
+        visible = [item for item in items if not self.is_hidden(item)] or list(items)
+        visible.sort(key=self.score, reverse=True)
+        return visible[:limit] if limit is not None else visible
+
+def get_ranker(user_id):
+    """
+    Build a Ranker from the cached score table and the user's votes
+
+    Falls back to a neutral ranker (original order) if either lookup fails.
+    """
+    config = current_app.config
+    if not config.get('RANKING_ENABLED', True):
+        return Ranker()
+    try:
+        scores = get_score_cache().get_or_load('all', load_scores)
+        upvoted, downvoted = get_user_vote_cache().get_or_load(str(user_id), lambda: load_user_votes(user_id))
+        return Ranker(scores, upvoted, downvoted, upvote_boost=config.get('RANKING_UPVOTE_BOOST', 1))
+    except Exception as e:
+        current_app.logger.error(f"Failed to load ranking data: {str(e)}")
+        return Ranker()
@@ -0,0 +1,108 @@
+"""
+Concurrent executor for dashboard sections.
+
+Runs independent section loaders in parallel on a shared thread pool and
+enforces an overall deadline. Sections that fail or miss the deadline are
+replaced with their fallback value.
+
+Loaders that miss the deadline keep running, so slow upstreams could fill
+every thread and leave later dashboards timing out while merely queued.
+Queued plus running loaders are therefore capped at
+DASHBOARD_SECTION_MAX_PENDING; past that, sections get their fallback
+immediately.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from flask import current_app
+
+_executor = None
+_slots = None
+_executor_lock = threading.Lock()
+
+def get_executor():
+    """Return the per-worker section thread pool, creating it on first use"""
+    global _executor, _slots
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                config = current_app.config
+                max_workers = config.get('DASHBOARD_SECTION_WORKERS', 8)
+                _slots = threading.BoundedSemaphore(config.get('DASHBOARD_SECTION_MAX_PENDING', 2 * max_workers))
+                _executor = ThreadPoolExecutor(
+                    max_workers=max_workers,
+                    thread_name_prefix='dashboard-section'
+                )
+    return _executor
+
+def submit_loader(app, loader):
+    """
+    Queue a loader on the section pool
+
+    Returns:
+        Its future, or None if DASHBOARD_SECTION_MAX_PENDING loaders are
+        already queued or running
+    """
+    executor = get_executor()
+    if not _slots.acquire(blocking=False):
+        return None
+    try:
+        future = executor.submit(_run_in_app_context, app, loader)
+    except BaseException:
+        _slots.release()
+        raise
+    future.add_done_callback(lambda _: _slots.release())
+    return future
+
+def _run_in_app_context(app, loader):
+    """Run a loader inside the given app context (worker threads have none)"""
+    with app.app_context():
+        return loader()
+
+def run_sections(sections, deadline=None):
+    """
+    Run dashboard section loaders concurrently with an overall deadline
+
+    Args:
+        sections: Dict mapping section name to a (loader, fallback) tuple.
+            Both are zero-argument callables; fallback is only called when
+            the loader raises or does not finish before the deadline.
+        deadline: Seconds to wait for all sections (defaults to
+            DASHBOARD_DEADLINE_SECONDS)
+
+    Returns:
+        Dict mapping section name to its result
+    """
+    if not sections:
+        return {}
+
+    app = current_app._get_current_object()
+    if deadline is None:
+        deadline = app.config.get('DASHBOARD_DEADLINE_SECONDS', 8)
+
+    futures = {
+        name: submit_loader(app, loader)
+        for name, (loader, _) in sections.items()
+    }
+
+    wait([future for future in futures.values() if future is not None], timeout=deadline)
+
+    results = {}
+    for name, future in futures.items():
+        fallback = sections[name][1]
+        if future is None:
+            app.logger.warning(f"Dashboard section pool is saturated, using fallback for '{name}'")
+            results[name] = fallback()
+            continue
+        if not future.done():
+            # Leave the loader running; its result is simply discarded
+            app.logger.warning(f"Dashboard section '{name}' missed the {deadline}s deadline, using fallback")
+            results[name] = fallback()
+            continue
+
+        try:
+            results[name] = future.result()
+        except Exception as e:
+            app.logger.error(f"Error loading dashboard section '{name}': {e}", exc_info=True)
+            results[name] = fallback()
+
+    return results
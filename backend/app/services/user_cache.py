@@ -0,0 +1,56 @@
+"""
+Per-worker cache of user profiles (projected user documents).
+
+Only the fields the dashboard, /auth/me and preferences routes need are
+loaded, never password_hash. Entries are LRU-bounded and expire after
+USER_PROFILE_CACHE_TTL_SECONDS. The worker that saves preferences drops its
+entry directly; other workers notice through the profile_version stamp on
+the user document, which they re-check (fetching only that field) once an
+entry is older than USER_PROFILE_REVALIDATE_SECONDS.
+"""
+from flask import current_app
+from app.cache import get_cache
+from app.queries import find_user
+
+def get_profile_cache():
+    return get_cache('user_profiles', 'USER_PROFILE_CACHE', default_ttl=300, default_max_entries=4096)
+
+def load_user_profile(user_id):
+    """Read a user's profile fields from MongoDB (None if the user does not exist)"""
+    return find_user(user_id, 'profile')
+
+def load_profile_version(user_id):
+    """Read only the user's profile_version stamp (None if the user does not exist)"""
+    stamp = find_user(user_id, 'version')
+    return None if stamp is None else stamp.get('profile_version', 0)
+
+def get_user_profile(user_id):
+    """
+    Return the user's cached profile, loading it on a miss
+
+    The returned dict is shared with other requests; treat it as read-only.
+
+    Returns:
+        Profile dict (_id, email, name, preferences, updated_at) or None if
+        the user does not exist
+    """
+    cache = get_profile_cache()
+    key = str(user_id)
+    profile = cache.get(key)
+    if profile is not None:
+        age = cache.age(key)
+        if age is not None and age < current_app.config.get('USER_PROFILE_REVALIDATE_SECONDS', 5):
+            return profile
+        if load_profile_version(user_id) == profile.get('profile_version', 0):
+            # Still current; restart its revalidation clock
+            cache.set(key, profile)
+            return profile
+        cache.delete(key)
+
+    profile = load_user_profile(user_id)
+    cache.set(key, profile)
+    return profile
+
+def invalidate_user_profile(user_id):
+    """Drop a user's cached profile in this worker"""
+    get_profile_cache().delete(str(user_id))
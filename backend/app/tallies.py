@@ -0,0 +1,112 @@
+"""
+Materialized vote tallies per content item (vote_tallies collection)
+
+Each tally holds up/down counts and score (up - down) for one
+(content_type, content_hash). Tallies are maintained incrementally from the
+old and new vote whenever a vote is cast or changed, and can be rebuilt
+from scratch from the feedback collection.
+"""
+from datetime import datetime
+from pymongo import UpdateOne
+
+TALLIES_COLLECTION = 'vote_tallies'
+
+def vote_delta(old_vote, new_vote):
+    """
+    Return the (up, down) count changes for replacing old_vote with new_vote
+
+    old_vote is None for a newly created vote.
+    """
+    up = (new_vote == 1) - (old_vote == 1)
+    down = (new_vote == -1) - (old_vote == -1)
+    return up, down
+
+def apply_vote_changes(db, changes):
+    """
+    Apply tally deltas for a list of vote changes in one bulk write
+
+    Args:
+        db: Mongo database
+        changes: Iterable of (content_type, content_hash, old_vote, new_vote)
+
+    Returns:
+        Number of tallies touched
+    """
+    totals = {}
+    for content_type, content_hash, old_vote, new_vote in changes:
+        up, down = vote_delta(old_vote, new_vote)
+        if not up and not down:
+            continue
+        key = (content_type, content_hash)
+        current = totals.get(key, (0, 0))
+        totals[key] = (current[0] + up, current[1] + down)
+
+    operations = [
+        UpdateOne(
+            {'content_type': content_type, 'content_hash': content_hash},
+            {
+                '$inc': {'up': up, 'down': down, 'score': up - down},
+                '$set': {'updated_at': datetime.utcnow()}
+            },
+            upsert=True
+        )
+        for (content_type, content_hash), (up, down) in totals.items()
+        if up or down
+    ]
+    if operations:
+        db[TALLIES_COLLECTION].bulk_write(operations, ordered=False)
+    return len(operations)
+
+def load_previous_votes(db, votes):
+    """
+    Look up existing votes for several (user_id, content_type, content_hash) keys
+
+    Args:
+        db: Mongo database
+        votes: Iterable of Feedback.vote_filter dicts
+
+    Returns:
+        Dict mapping (str user_id, content_type, content_hash) to the stored vote
+    """
+    filters = list(votes)
+    if not filters:
+        return {}
+    previous = {}
+    for doc in db.feedback.find({'$or': filters}, {'user_id': 1, 'content_type': 1, 'content_hash': 1, 'vote': 1}):
+        previous[(str(doc['user_id']), doc['content_type'], doc['content_hash'])] = doc.get('vote')
+    return previous
+
+def rebuild_tallies(db):
+    """
+    Recompute every tally from the feedback collection with an aggregation pipeline
+
+    Returns:
+        Number of tallies written
+    """
+    pipeline = [
+        {'$group': {
+            '_id': {'content_type': '$content_type', 'content_hash': '$content_hash'},
+            'up': {'$sum': {'$cond': [{'$eq': ['$vote', 1]}, 1, 0]}},
+            'down': {'$sum': {'$cond': [{'$eq': ['$vote', -1]}, 1, 0]}}
+        }},
+        {'$project': {
+            '_id': 0,
+            'content_type': '$_id.content_type',
+            'content_hash': '$_id.content_hash',
+            'up': 1,
+            'down': 1,
+            'score': {'$subtract': ['$up', '$down']},
+            'updated_at': '$$NOW'
+        }},
+        # $out swaps the collection atomically and keeps its indexes
+        {'$out': TALLIES_COLLECTION}
+    ]
+    db.feedback.aggregate(pipeline, allowDiskUse=True)
+    return db[TALLIES_COLLECTION].estimated_document_count()
+
+def top_content(db, content_type, limit=10):
+    """Return the highest-scoring tallies for a content type (index lookup)"""
+    return list(db[TALLIES_COLLECTION].find(
+        {'content_type': content_type},
+        {'_id': 0, 'content_hash': 1, 'up': 1, 'down': 1, 'score': 1}
+    ).sort('score', -1).limit(limit))
@@ -4,20 +4,80 @@ Utility functions for authentication and helpers
 import bcrypt
 import hashlib
 import json
+from functools import lru_cache
 
-def hash_password(password):
+def hash_password(password, rounds=12):
     """Hash a password using bcrypt"""
-    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds=12)).decode('utf-8')
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds=rounds)).decode('utf-8')
 
 def verify_password(password, password_hash):
     """Verify a password against a hash"""
     return bcrypt.checkpw(password.encode('utf-8'), password_hash.encode('utf-8'))
 
+def password_hash_rounds(password_hash):
+    """Return the bcrypt cost encoded in a hash ($2b$<rounds>$...), or None"""
+    parts = password_hash.split('$')
+    if len(parts) < 4:
+        return None
+    try:
+        return int(parts[2])
+    except ValueError:
+        return None
+
+# Reused encoder; produces exactly what json.dumps(content, sort_keys=True) does
+_canonical_encoder = json.JSONEncoder(sort_keys=True)
+
+# Maximum number of distinct dict contents whose hashes are remembered per worker
+CONTENT_HASH_MEMO_SIZE = 16384
+
 def generate_content_hash(content):
     """Generate a unique hash for content to track feedback"""
     if isinstance(content, dict):
-        content_str = json.dumps(content, sort_keys=True)
+        try:
+            # Value types are part of the key so that e.g. 1 and True don't share a hash
+            key = tuple(sorted((name, value.__class__, value) for name, value in content.items()))
+            return _memo_content_hash(key)
+        except TypeError:
+            # Unhashable values or unorderable keys; hash without the memo
+            content_str = _canonical_encoder.encode(content)
     else:
         content_str = str(content)
     return hashlib.sha256(content_str.encode('utf-8')).hexdigest()
 
+@lru_cache(maxsize=CONTENT_HASH_MEMO_SIZE)
+def _memo_content_hash(key):
+    content_str = _canonical_encoder.encode({name: value for name, _, value in key})
+    return hashlib.sha256(content_str.encode('utf-8')).hexdigest()
+
+def news_content_hash(item):
+    """Content hash of a news item (feedback key)"""
+    return generate_content_hash({
+        'type': 'news',
+        'id': item.get('id'),
+        'title': item.get('title')
+    })
+
+def price_content_hash(coin):
+    """Content hash of a coin price entry (feedback key)"""
+    return generate_content_hash({
+        'type': 'price',
+        'id': coin.get('id'),
+        'name': coin.get('name')
+    })
+
+def meme_content_hash(meme):
+    """Content hash of a meme (feedback key)"""
+    return generate_content_hash({
+        'type': 'meme',
+        'id': meme.get('id'),
+        'url': meme.get('url')
+    })
+
+def insight_content_hash(insight, user):
+    """Content hash of an AI insight; depends on the user's last update"""
+    return generate_content_hash({
+        'type': 'insight',
+        'text': insight.get('text', ''),
+        'date': str(user.get('updated_at', ''))
+    })
+
@@ -0,0 +1,133 @@
+"""
+Vote writes on the unique (user_id, content_type, content_hash) key
+
+Tally deltas need the vote each write replaced. A single vote reads it
+atomically with find_one_and_update(..., BEFORE). Batches read all old
+votes in one query and then write each vote only if the stored vote is
+still the one that was read: the filter includes the old vote, so a vote
+changed (or created) concurrently no longer matches, the upsert collides
+with the unique index, and that one vote is retried atomically on its own.
+Every old vote reported for a successful write is therefore exact.
+
+That relies on the user_content_unique index: without it a missed
+conditional upsert would insert a second document. Until the index is
+seen, batches are written vote by vote instead.
+"""
+import time
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+from app.indexes import index_exists
+from app.models import Feedback
+from app.tallies import load_previous_votes
+
+# How long a confirmed unique index is trusted before it is checked again
+UNIQUE_INDEX_CHECK_SECONDS = 60
+
+# Database name -> monotonic time the unique vote index was last confirmed
+_unique_index_seen = {}
+
+def has_unique_vote_index(db):
+    """True if feedback has the user_content_unique index (re-checked every minute)"""
+    seen = _unique_index_seen.get(db.name)
+    if seen is not None and time.monotonic() - seen < UNIQUE_INDEX_CHECK_SECONDS:
+        return True
+    if index_exists(db, 'feedback', 'user_content_unique', unique=True):
+        _unique_index_seen[db.name] = time.monotonic()
+        return True
+    _unique_index_seen.pop(db.name, None)
+    return False
+
+def record_vote(db, user_id, content_type, content_hash, vote, timestamp=None):
+    """
+    Record one vote in a single atomic upsert
+
+    timestamp is when the vote was cast (now if None).
+
+    Returns:
+        Tuple of (created, previous vote or None)
+    """
+    vote_filter = Feedback.vote_filter(user_id, content_type, content_hash)
+    update = Feedback.vote_update(vote, timestamp)
+    try:
+        previous = db.feedback.find_one_and_update(
+            vote_filter,
+            update,
+            upsert=True,
+            projection={'vote': 1},
+            return_document=ReturnDocument.BEFORE
+        )
+    except DuplicateKeyError:
+        # A concurrent upsert inserted the document first; ours is now an update
+        previous = db.feedback.find_one_and_update(
+            vote_filter,
+            update,
+            projection={'vote': 1},
+            return_document=ReturnDocument.BEFORE
+        )
+
+    if previous is None:
+        return True, None
+    return False, previous.get('vote')
+
+def write_votes(db, votes):
+    """
+    Record several votes with one unordered bulk write
+
+    Args:
+        db: Mongo database
+        votes: List of (user_id, content_type, content_hash, vote, timestamp),
+            at most one per unique key; timestamp is when the vote was cast
+            (now if None)
+
+    Returns:
+        List aligned with votes of (status, previous vote, error message)
+        where status is 'created', 'updated' or 'error'; previous is exact
+        for every vote that was written
+
+    Raises:
+        Exception from the database if nothing could be written (no vote
+        from this call has been applied unless it is retried)
+    """
+    if not votes:
+        return []
+    if not has_unique_vote_index(db):
+        return [record_single_vote(db, vote) for vote in votes]
+    filters = [Feedback.vote_filter(user_id, content_type, content_hash)
+               for user_id, content_type, content_hash, _, _ in votes]
+    previous_votes = load_previous_votes(db, filters)
+    expected = [
+        previous_votes.get((str(vote_filter['user_id']), vote_filter['content_type'], vote_filter['content_hash']))
+        for vote_filter in filters
+    ]
+    operations = [
+        UpdateOne({**vote_filter, 'vote': old_vote}, Feedback.vote_update(vote, timestamp), upsert=True)
+        for vote_filter, old_vote, (_, _, _, vote, timestamp) in zip(filters, expected, votes)
+    ]
+
+    write_errors = {}
+    try:
+        upserted = set(db.feedback.bulk_write(operations, ordered=False).upserted_ids)
+    except BulkWriteError as bwe:
+        upserted = {entry['index'] for entry in bwe.details.get('upserted', [])}
+        write_errors = {entry['index']: entry for entry in bwe.details.get('writeErrors', [])}
+
+    outcomes = []
+    for index in range(len(votes)):
+        entry = write_errors.get(index)
+        if entry is None:
+            outcomes.append(('created' if index in upserted else 'updated', expected[index], None))
+        elif entry.get('code') == 11000:
+            # The stored vote changed since it was read (or a concurrent upsert
+            # won the insert): retry this one atomically
+            outcomes.append(record_single_vote(db, votes[index]))
+        else:
+            outcomes.append(('error', None, entry.get('errmsg', 'Write failed')))
+    return outcomes
+
+def record_single_vote(db, vote):
+    """write_votes outcome for one (user_id, content_type, content_hash, vote, timestamp) via record_vote"""
+    try:
+        created, previous = record_vote(db, *vote)
+        return ('created' if created else 'updated', previous, None)
+    except Exception as e:
+        return ('error', None, str(e))
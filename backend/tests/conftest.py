@@ -0,0 +1,53 @@
+"""
+Shared test fixtures.
+
+Tests run against app instances that never start the index bootstrap.
+Tests that need a real MongoDB use the mongo_app fixture, which points at
+TEST_MONGO_URI (default localhost) and skips when no server answers.
+"""
+import os
+import uuid
+import pytest
+from pymongo import MongoClient
+from pymongo.errors import PyMongoError
+from app import create_app
+from app.config import Config
+from app.indexes import ensure_indexes
+
+TEST_MONGO_URI = os.environ.get('TEST_MONGO_URI') or 'mongodb://localhost:27017'
+
+def make_config(database='crypto_dashboard_test', **overrides):
+    """Config class for a test app using the given database"""
+    class TestConfig(Config):
+        TESTING = True
+        MONGO_URI = f"{TEST_MONGO_URI.rstrip('/')}/{database}"
+        MONGO_ENSURE_INDEXES = False
+        FEEDBACK_WRITE_BEHIND = False
+    for key, value in overrides.items():
+        setattr(TestConfig, key, value)
+    return TestConfig
+
+@pytest.fixture
+def make_app():
+    """Factory for test apps: make_app(**config_overrides)"""
+    return lambda **overrides: create_app(make_config(**overrides))
+
+@pytest.fixture
+def app(make_app):
+    return make_app()
+
+@pytest.fixture
+def mongo_app():
+    """(app, db) on a throwaway database with all indexes, dropped afterwards"""
+    client = MongoClient(TEST_MONGO_URI, serverSelectionTimeoutMS=1000)
+    try:
+        client.admin.command('ping')
+    except PyMongoError:
+        pytest.skip(f'MongoDB not reachable at {TEST_MONGO_URI}')
+    database = f'crypto_dashboard_test_{uuid.uuid4().hex[:8]}'
+    ensure_indexes(client[database])
+    try:
+        yield create_app(make_config(database)), client[database]
+    finally:
+        client.drop_database(database)
+        client.close()
@@ -0,0 +1,67 @@
+"""
+Concurrent votes on the same (user, content) must collapse into one document.
+
+The race test needs a MongoDB server (TEST_MONGO_URI, default localhost) and
+is skipped without one. The atomic upsert and its retry path are also
+checked against a mocked collection, so they are covered without MongoDB.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+from bson import ObjectId
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from app.routes.feedback import upsert_vote
+
+def test_concurrent_upserts_create_one_document(mongo_app):
+    app, db = mongo_app
+    user_id = str(ObjectId())
+    start = threading.Barrier(8)
+
+    def vote(_):
+        with app.app_context():
+            start.wait()
+            return upsert_vote(user_id, 'news', 'race', 1)
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(vote, range(8)))
+
+    assert db.feedback.count_documents({'user_id': ObjectId(user_id)}) == 1
+    assert [created for created, _ in results].count(True) == 1
+    tally = db.vote_tallies.find_one({'content_type': 'news', 'content_hash': 'race'})
+    assert (tally['up'], tally['down'], tally['score']) == (1, 0, 1)
+
+def test_vote_is_one_atomic_upsert_on_the_unique_key(app):
+    user_id = str(ObjectId())
+    with app.app_context(), \
+            mock.patch('app.routes.feedback.mongo') as mongo, \
+            mock.patch('app.routes.feedback.update_tallies') as update_tallies:
+        mongo.db.feedback.find_one_and_update.return_value = None
+        created, previous = upsert_vote(user_id, 'news', 'race', 1)
+
+    assert (created, previous) == (True, None)
+    call = mongo.db.feedback.find_one_and_update.call_args
+    assert call.args[0] == {'user_id': ObjectId(user_id), 'content_type': 'news', 'content_hash': 'race'}
+    assert call.args[1]['$set']['vote'] == 1
+    assert call.kwargs['upsert'] is True
+    assert call.kwargs['return_document'] == ReturnDocument.BEFORE
+    mongo.db.feedback.insert_one.assert_not_called()
+    update_tallies.assert_called_once_with([('news', 'race', None, 1)])
+
+def test_duplicate_key_on_upsert_is_retried_as_update(app):
+    feedback = mock.MagicMock()
+    # The concurrent winner inserted first: our upsert loses on the unique
+    # index and the retry sees the winner's vote as the previous one
+    feedback.find_one_and_update.side_effect = [
+        DuplicateKeyError('E11000 duplicate key error'),
+        {'_id': ObjectId(), 'vote': 1}
+    ]
+    with app.app_context(), \
+            mock.patch('app.routes.feedback.mongo') as mongo, \
+            mock.patch('app.routes.feedback.update_tallies') as update_tallies:
+        mongo.db.feedback = feedback
+        created, previous = upsert_vote(str(ObjectId()), 'news', 'race', -1)
+
+    assert (created, previous) == (False, 1)
+    assert 'upsert' not in feedback.find_one_and_update.call_args_list[1].kwargs
+    update_tallies.assert_called_once_with([('news', 'race', 1, -1)])
@@ -0,0 +1,48 @@
+"""
+Concurrent /insight/stream requests for one cohort share a single OpenRouter call.
+"""
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+from app.services import ai_service
+
+TOKENS = ['Bitcoin ', 'looks ', 'steady.']
+
+class FakeStreamResponse:
+    status_code = 200
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def iter_lines(self, decode_unicode=False):
+        for token in TOKENS:
+            time.sleep(0.05)
+            yield 'data: ' + json.dumps({'choices': [{'delta': {'content': token}}]})
+        yield 'data: [DONE]'
+
+def test_concurrent_streams_share_one_call(make_app):
+    app = make_app(OPENROUTER_API_KEY='test', AI_PREGEN_ENABLED=False)
+    preferences = {'investor_type': 'Stream Tester', 'interested_assets': ['BTC']}
+    start = threading.Barrier(5)
+
+    def stream(_):
+        with app.app_context():
+            start.wait()
+            return list(ai_service.stream_ai_insight(preferences))
+
+    with mock.patch.object(ai_service.http_client, 'post', return_value=FakeStreamResponse()) as post:
+        with ThreadPoolExecutor(max_workers=5) as pool:
+            results = list(pool.map(stream, range(5)))
+
+    assert post.call_count == 1
+    for events in results:
+        assert ''.join(data for event, data in events if event == 'token') == ''.join(TOKENS)
+        assert events[-1] == ('done', {'text': 'Bitcoin looks steady.', 'model': mock.ANY, 'generated': True})
+    with app.app_context():
+        cached = ai_service.get_insight_cache().get(ai_service.get_cohort_key(preferences))
+    assert cached['text'] == 'Bitcoin looks steady.'
@@ -0,0 +1,77 @@
+"""
+Batch vote writes: exact old votes under concurrency, partial failures.
+"""
+from datetime import datetime
+from unittest import mock
+from bson import ObjectId
+from pymongo.errors import BulkWriteError
+from app.services.feedback_buffer import FeedbackBuffer
+from app.votes import write_votes
+
+USER_ID = str(ObjectId())
+VOTED_AT = datetime(2026, 1, 1, 12, 0, 0)
+
+def make_db(stored, write_errors=(), upserted=(), retried=None, unique_index=True):
+    """Fake db: stored votes by content_hash, bulk write failing at write_errors"""
+    db = mock.MagicMock()
+    db.__getitem__.side_effect = lambda collection: getattr(db, collection)
+    db.feedback.index_information.return_value = (
+        {'user_content_unique': {'unique': True}} if unique_index else {}
+    )
+    db.feedback.find.return_value = [
+        {'user_id': ObjectId(USER_ID), 'content_type': 'news', 'content_hash': content_hash, 'vote': vote}
+        for content_hash, vote in stored.items()
+    ]
+    if write_errors:
+        db.feedback.bulk_write.side_effect = BulkWriteError({
+            'writeErrors': [{'index': index, 'code': code, 'errmsg': f'error {code}'} for index, code in write_errors],
+            'upserted': [{'index': index} for index in upserted]
+        })
+    else:
+        db.feedback.bulk_write.return_value.upserted_ids = {index: ObjectId() for index in upserted}
+    db.feedback.find_one_and_update.return_value = retried
+    return db
+
+def test_writes_are_conditional_on_the_vote_read():
+    db = make_db({'a': -1}, upserted=[1])
+    outcomes = write_votes(db, [(USER_ID, 'news', 'a', 1, None), (USER_ID, 'news', 'b', 1, None)])
+
+    assert outcomes == [('updated', -1, None), ('created', None, None)]
+    operations = db.feedback.bulk_write.call_args.args[0]
+    assert [operation._filter['vote'] for operation in operations] == [-1, None]
+
+def test_conflicting_vote_is_retried_atomically():
+    # 'a' was changed to 1 by a concurrent request after it was read as -1
+    db = make_db({'a': -1}, write_errors=[(0, 11000), (1, 2)], retried={'vote': 1})
+    outcomes = write_votes(db, [(USER_ID, 'news', 'a', -1, None), (USER_ID, 'news', 'b', 1, None)])
+
+    assert outcomes == [('updated', 1, None), ('error', None, 'error 2')]
+
+def test_without_unique_index_votes_are_written_one_by_one():
+    # A conditional upsert that misses would insert a duplicate vote document
+    db = make_db({'a': -1}, unique_index=False, retried={'vote': 1})
+    outcomes = write_votes(db, [(USER_ID, 'news', 'a', -1, None)])
+
+    assert outcomes == [('updated', 1, None)]
+    db.feedback.bulk_write.assert_not_called()
+    assert db.feedback.find_one_and_update.call_args.kwargs['upsert'] is True
+
+def test_flush_requeues_only_failed_votes(app):
+    db = make_db({}, write_errors=[(1, 2)], upserted=[0])
+    with mock.patch('app.services.feedback_buffer.mongo') as mongo, \
+            mock.patch('app.services.feedback_buffer.apply_vote_changes') as apply_vote_changes, \
+            mock.patch('app.services.feedback_buffer.invalidate_snapshot') as invalidate_snapshot, \
+            mock.patch.object(FeedbackBuffer, '_run'):
+        mongo.db = db
+        buffer = FeedbackBuffer(app)
+        buffer.add(USER_ID, 'news', 'a', 1, VOTED_AT)
+        buffer.add(USER_ID, 'news', 'b', -1, VOTED_AT)
+        written = buffer.flush()
+
+    assert written == 1
+    assert dict(buffer._pending) == {(USER_ID, 'news', 'b'): (-1, VOTED_AT)}
+    # Queued votes keep the time they were cast, not the flush time
+    operations = db.feedback.bulk_write.call_args.args[0]
+    assert [operation._doc['$set']['timestamp'] for operation in operations] == [VOTED_AT, VOTED_AT]
+    apply_vote_changes.assert_called_once_with(db, [('news', 'a', None, 1)])
+    invalidate_snapshot.assert_called_once_with(USER_ID)
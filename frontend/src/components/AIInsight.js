@@ -1,14 +1,43 @@
-import React from 'react';
+import React, { useState, useEffect } from 'react';
 import { FaBrain } from 'react-icons/fa';
 import FeedbackButtons from './FeedbackButtons';
+import { streamInsight } from '../services/insightStream';
+import { useDashboardSection } from '../services/useDashboardSection';
 
-const AIInsight = ({ insight }) => {
-  if (!insight || !insight.text) {
+const AIInsight = ({ refreshKey }) => {
+  const { data: insight, loading } = useDashboardSection('insight', 'ai_insight', refreshKey);
+  const [streamed, setStreamed] = useState(null);
+
+  // The dashboard returns a placeholder while the insight is generated; stream it in
+  useEffect(() => {
+    if (!insight || !insight.pending) {
+      setStreamed(null);
+      return undefined;
+    }
+
+    const controller = new AbortController();
+    setStreamed({ text: '' });
+    streamInsight({
+      signal: controller.signal,
+      onToken: (text) => setStreamed((prev) => ({ ...prev, text: (prev?.text || '') + text })),
+      onDone: (finalInsight) => setStreamed(finalInsight),
+    }).catch((err) => {
+      if (err.name !== 'AbortError') {
+        setStreamed(null);
+      }
+    });
+
+    return () => controller.abort();
+  }, [insight]);
+
+  const current = insight && insight.pending ? streamed : insight;
+
+  if (!current || !current.text) {
     return (
       <div className="dashboard-card">
         <h2><FaBrain /> AI Insight of the Day</h2>
         <div className="card-content">
-          <p>No insight available at the moment.</p>
+          <p>{loading ? 'Loading insight...' : insight && insight.pending && streamed ? 'Generating insight...' : 'No insight available at the moment.'}</p>
         </div>
       </div>
     );
@@ -18,17 +47,17 @@ const AIInsight = ({ insight }) => {
     <div className="dashboard-card">
       <h2><FaBrain /> AI Insight of the Day</h2>
       <div className="ai-insight">
-        <div className="ai-insight-text">{insight.text}</div>
-        {insight.model && (
+        <div className="ai-insight-text">{current.text}</div>
+        {current.model && (
           <div className="ai-insight-meta">
-            Generated by {insight.model}
+            Generated by {current.model}
           </div>
         )}
       </div>
-      {insight.content_hash && (
+      {current.content_hash && (
         <FeedbackButtons
           contentType="insight"
-          contentHash={insight.content_hash}
+          contentHash={current.content_hash}
         />
       )}
     </div>
@@ -36,4 +65,3 @@ const AIInsight = ({ insight }) => {
 };
 
 export default AIInsight;
-
@@ -1,14 +1,17 @@
 import React from 'react';
 import { FaCoins } from 'react-icons/fa';
 import FeedbackButtons from './FeedbackButtons';
+import { useDashboardSection } from '../services/useDashboardSection';
+
+const CoinPrices = ({ refreshKey }) => {
+  const { data: prices, loading } = useDashboardSection('prices', 'prices', refreshKey);
 
-const CoinPrices = ({ prices }) => {
   if (!prices || prices.length === 0) {
     return (
       <div className="dashboard-card">
         <h2><FaCoins /> Coin Prices</h2>
         <div className="card-content">
-          <p>No price data available at the moment.</p>
+          <p>{loading ? 'Loading prices...' : 'No price data available at the moment.'}</p>
         </div>
       </div>
     );
@@ -1,14 +1,17 @@
 import React from 'react';
 import { FaLaugh } from 'react-icons/fa';
 import FeedbackButtons from './FeedbackButtons';
+import { useDashboardSection } from '../services/useDashboardSection';
+
+const CryptoMeme = ({ refreshKey }) => {
+  const { data: meme, loading } = useDashboardSection('meme', 'meme', refreshKey);
 
-const CryptoMeme = ({ meme }) => {
   if (!meme || !meme.url) {
     return (
       <div className="dashboard-card">
         <h2><FaLaugh /> Fun Crypto Meme</h2>
         <div className="card-content">
-          <p>No meme available at the moment.</p>
+          <p>{loading ? 'Loading meme...' : 'No meme available at the moment.'}</p>
         </div>
       </div>
     );
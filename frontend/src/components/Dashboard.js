@@ -9,8 +9,8 @@ import AIInsight from './AIInsight';
 import CryptoMeme from './CryptoMeme';
 
 const Dashboard = () => {
-  const [dashboardData, setDashboardData] = useState(null);
   const [loading, setLoading] = useState(true);
+  const [refreshKey, setRefreshKey] = useState(0);
   const [error, setError] = useState('');
   const [user, setUser] = useState(null);
   const [userPreferences, setUserPreferences] = useState(null);
@@ -27,18 +27,21 @@ const Dashboard = () => {
     const currentUser = authService.getCurrentUser();
     setUser(currentUser);
 
-    // Fetch dashboard data
-    fetchDashboard();
+    // Sections load themselves; we only need to know which ones to show
+    fetchPreferences();
   }, [navigate]);
 
-  const fetchDashboard = async () => {
+  const fetchPreferences = async () => {
     setLoading(true);
     setError('');
 
     try {
-      const response = await api.get('/dashboard');
-      setDashboardData(response.data.dashboard);
-      setUserPreferences(response.data.user_preferences);
+      const response = await api.get('/user/preferences');
+      const preferences = response.data.preferences;
+      setUserPreferences({
+        ...preferences,
+        content_types: preferences?.content_types || ['Market News'],
+      });
     } catch (err) {
       setError(err.response?.data?.error || 'Failed to load dashboard. Please try again.');
     } finally {
@@ -52,7 +55,7 @@ const Dashboard = () => {
   };
 
   const handleRefresh = () => {
-    fetchDashboard();
+    setRefreshKey((key) => key + 1);
   };
 
   if (loading) {
@@ -65,12 +68,12 @@ const Dashboard = () => {
     );
   }
 
-  if (error && !dashboardData) {
+  if (error && !userPreferences) {
     return (
       <div className="dashboard-container">
         <div className="dashboard-card">
           <div className="error-message">{error}</div>
-          <button className="btn btn-primary" onClick={fetchDashboard} style={{ marginTop: '20px' }}>
+          <button className="btn btn-primary" onClick={fetchPreferences} style={{ marginTop: '20px' }}>
             Retry
           </button>
         </div>
@@ -112,16 +115,16 @@ const Dashboard = () => {
       <div className="dashboard-grid">
         {/* Display sections based on user's content type preferences */}
         {userPreferences?.content_types?.includes('Market News') && (
-          <MarketNews news={dashboardData?.news || []} />
+          <MarketNews refreshKey={refreshKey} />
         )}
         {userPreferences?.content_types?.includes('Charts') && (
-          <CoinPrices prices={dashboardData?.prices || []} />
+          <CoinPrices refreshKey={refreshKey} />
         )}
         {userPreferences?.content_types?.includes('Social') && (
-          <AIInsight insight={dashboardData?.ai_insight || {}} />
+          <AIInsight refreshKey={refreshKey} />
         )}
         {userPreferences?.content_types?.includes('Fun') && (
-          <CryptoMeme meme={dashboardData?.meme || {}} />
+          <CryptoMeme refreshKey={refreshKey} />
         )}
       </div>
     </div>
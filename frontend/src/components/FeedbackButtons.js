@@ -1,6 +1,6 @@
 import React, { useState } from 'react';
 import { FaThumbsUp, FaThumbsDown } from 'react-icons/fa';
-import api from '../services/api';
+import { queueVote } from '../services/feedbackQueue';
 
 const FeedbackButtons = ({ contentType, contentHash }) => {
   const [vote, setVote] = useState(null);
@@ -11,11 +11,7 @@ const FeedbackButtons = ({ contentType, contentHash }) => {
     
     setLoading(true);
     try {
-      await api.post('/feedback', {
-        content_type: contentType,
-        content_hash: contentHash,
-        vote: voteValue
-      });
+      await queueVote(contentType, contentHash, voteValue);
       setVote(voteValue);
     } catch (error) {
       console.error('Failed to submit feedback:', error);
@@ -1,14 +1,17 @@
 import React from 'react';
 import { FaNewspaper } from 'react-icons/fa';
 import FeedbackButtons from './FeedbackButtons';
+import { useDashboardSection } from '../services/useDashboardSection';
+
+const MarketNews = ({ refreshKey }) => {
+  const { data: news, loading } = useDashboardSection('news', 'news', refreshKey);
 
-const MarketNews = ({ news }) => {
   if (!news || news.length === 0) {
     return (
       <div className="dashboard-card">
         <h2><FaNewspaper /> Market News</h2>
         <div className="card-content">
-          <p>No news available at the moment.</p>
+          <p>{loading ? 'Loading news...' : 'No news available at the moment.'}</p>
         </div>
       </div>
     );
@@ -0,0 +1,49 @@
+/**
+ * Collects feedback votes for a short window and sends them in one
+ * POST /feedback/batch request. Repeated votes on the same content within
+ * a window are coalesced; every caller's promise settles with its result.
+ */
+import api from './api';
+
+const FLUSH_DELAY_MS = 500;
+
+let pending = new Map();
+let timer = null;
+
+const flush = async () => {
+  const batch = pending;
+  pending = new Map();
+  timer = null;
+
+  const entries = Array.from(batch.values());
+  try {
+    const response = await api.post('/feedback/batch', {
+      votes: entries.map(({ vote }) => vote),
+    });
+    const results = response.data.results || [];
+    entries.forEach((entry, index) => {
+      const result = results[index];
+      if (result && result.status !== 'error') {
+        entry.callbacks.forEach(({ resolve }) => resolve(result));
+      } else {
+        const error = new Error(result?.error || 'Failed to submit feedback');
+        entry.callbacks.forEach(({ reject }) => reject(error));
+      }
+    });
+  } catch (error) {
+    entries.forEach((entry) => entry.callbacks.forEach(({ reject }) => reject(error)));
+  }
+};
+
+export const queueVote = (contentType, contentHash, voteValue) =>
+  new Promise((resolve, reject) => {
+    const key = `${contentType}:${contentHash}`;
+    const entry = pending.get(key) || { callbacks: [] };
+    entry.vote = { content_type: contentType, content_hash: contentHash, vote: voteValue };
+    entry.callbacks.push({ resolve, reject });
+    pending.set(key, entry);
+
+    if (!timer) {
+      timer = setTimeout(flush, FLUSH_DELAY_MS);
+    }
+  });
@@ -0,0 +1,46 @@
+/**
+ * Server-sent events client for the streaming AI insight endpoint.
+ * Uses fetch instead of EventSource so the JWT can be sent as a header.
+ */
+import api from './api';
+
+export const streamInsight = async ({ onToken, onDone, signal }) => {
+  const token = localStorage.getItem('access_token');
+  const response = await fetch(`${api.defaults.baseURL}/dashboard/insight/stream`, {
+    headers: token ? { Authorization: `Bearer ${token}` } : {},
+    signal,
+  });
+
+  if (!response.ok || !response.body) {
+    throw new Error(`Insight stream failed with status ${response.status}`);
+  }
+
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+
+  while (true) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+
+    // Events are separated by a blank line
+    let boundary;
+    while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+      const rawEvent = buffer.slice(0, boundary);
+      buffer = buffer.slice(boundary + 2);
+
+      let event = 'message';
+      let data = '';
+      rawEvent.split('\n').forEach((line) => {
+        if (line.startsWith('event:')) event = line.slice(6).trim();
+        else if (line.startsWith('data:')) data += line.slice(5).trim();
+      });
+      if (!data) continue;
+
+      const payload = JSON.parse(data);
+      if (event === 'token') onToken(payload.text);
+      else if (event === 'done') onDone(payload);
+    }
+  }
+};
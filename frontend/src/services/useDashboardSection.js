@@ -0,0 +1,52 @@
+/**
+ * Loads one dashboard section (/dashboard/<section>) on its own and
+ * refreshes it at its own rate, so slow sections never hold up fast ones.
+ */
+import { useState, useEffect } from 'react';
+import api from './api';
+
+// Refresh intervals, matching the backend's DASHBOARD_<SECTION>_TTL_SECONDS defaults
+export const SECTION_REFRESH_MS = {
+  news: 60 * 1000,
+  prices: 30 * 1000,
+  insight: 60 * 60 * 1000,
+  meme: 5 * 60 * 1000,
+};
+
+export const useDashboardSection = (section, dataKey, refreshKey) => {
+  const [data, setData] = useState(null);
+  const [loading, setLoading] = useState(true);
+  const [error, setError] = useState('');
+
+  useEffect(() => {
+    let cancelled = false;
+
+    const load = async () => {
+      try {
+        const response = await api.get(`/dashboard/${section}`);
+        if (!cancelled) {
+          setData(response.data[dataKey]);
+          setError('');
+        }
+      } catch (err) {
+        if (!cancelled) {
+          setError(err.response?.data?.error || `Failed to load ${section}.`);
+        }
+      } finally {
+        if (!cancelled) {
+          setLoading(false);
+        }
+      }
+    };
+
+    load();
+    const timer = setInterval(load, SECTION_REFRESH_MS[section]);
+
+    return () => {
+      cancelled = true;
+      clearInterval(timer);
+    };
+  }, [section, dataKey, refreshKey]);
+
+  return { data, loading, error };
+};